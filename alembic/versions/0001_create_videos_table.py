@@ -0,0 +1,38 @@
+"""create videos table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'videos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=True),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('video_file', sa.String(), nullable=True),
+        sa.Column('duration', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_videos_id'), 'videos', ['id'], unique=False)
+    op.create_index(op.f('ix_videos_title'), 'videos', ['title'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_videos_title'), table_name='videos')
+    op.drop_index(op.f('ix_videos_id'), table_name='videos')
+    op.drop_table('videos')
@@ -0,0 +1,32 @@
+"""add composite indexes for list filtering and sorting
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the videos table writable while the indexes build;
+    # it cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_videos_created_at_id', 'videos', ['created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_videos_updated_at_id', 'videos', ['updated_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_videos_duration_id', 'videos', ['duration', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_videos_duration_id', table_name='videos', postgresql_concurrently=True)
+        op.drop_index('ix_videos_updated_at_id', table_name='videos', postgresql_concurrently=True)
+        op.drop_index('ix_videos_created_at_id', table_name='videos', postgresql_concurrently=True)
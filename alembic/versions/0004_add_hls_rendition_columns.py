@@ -0,0 +1,26 @@
+"""add hls rendition columns to videos
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('hls_status', sa.String(length=20), nullable=True))
+    op.add_column('videos', sa.Column('hls_playlist', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'hls_playlist')
+    op.drop_column('videos', 'hls_status')
@@ -0,0 +1,39 @@
+"""create video changes table for the change feed
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'video_changes',
+        sa.Column('seq', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+    )
+    op.create_index(op.f('ix_video_changes_video_id'), 'video_changes', ['video_id'], unique=False)
+
+    # Seed the feed with the existing catalog so consumers can bootstrap from it
+    op.execute(
+        "INSERT INTO video_changes (video_id, operation, changed_at) "
+        "SELECT id, 'create', created_at FROM videos ORDER BY id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_video_changes_video_id'), table_name='video_changes')
+    op.drop_table('video_changes')
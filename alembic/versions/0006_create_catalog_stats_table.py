@@ -0,0 +1,44 @@
+"""create catalog stats table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_stats',
+        sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('total_videos', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.Column('total_duration', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.Column('hls_pending', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.Column('hls_ready', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.Column('hls_failed', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('slot'),
+    )
+
+    # Start from the current catalog; the application keeps it up to date afterwards
+    op.execute(
+        "INSERT INTO catalog_stats "
+        "(slot, total_videos, total_duration, hls_pending, hls_ready, hls_failed) "
+        "SELECT 0, count(*), coalesce(sum(duration), 0), "
+        "count(*) FILTER (WHERE hls_status = 'pending'), "
+        "count(*) FILTER (WHERE hls_status = 'ready'), "
+        "count(*) FILTER (WHERE hls_status = 'failed') "
+        "FROM videos"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_stats')
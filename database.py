@@ -1,5 +1,9 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 from starlette.config import Config
 
 # Read configuration from environment variables and/or ".env" files
@@ -12,6 +16,13 @@ POSTGRES_PASS = config("POSTGRES_PASS")
 POSTGRES_DB = config("POSTGRES_DB")
 DB_TYPE = config("DB_TYPE")
 
+# Connection pool tuning
+DB_POOL_SIZE = config("DB_POOL_SIZE", cast=int, default=5)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", cast=int, default=10)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", cast=float, default=30)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", cast=int, default=-1)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", cast=bool, default=False)
+
 # Build the connection URL for the database
 SQLALCHEMY_DATABASE_URL = f"{DB_TYPE}://{POSTGRES_USER}:{POSTGRES_PASS}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
@@ -48,8 +59,153 @@ engine = create_engine('mongodb+pyodbc://', creator=lambda: database)
 # Additional databases can be defined similarly, based on the database you want to use.
 
 
+class PoolMetrics:
+    """Connection pool counters, fed by SQLAlchemy pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connected_at = {}
+        self.connects_total = 0
+        self.checkouts_total = 0
+        self.invalidations_total = 0
+        self.soft_invalidations_total = 0
+        self.checkout_timeouts_total = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects_total += 1
+            self._connected_at[id(connection_record)] = time.monotonic()
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts_total += 1
+
+    def on_close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._connected_at.pop(id(connection_record), None)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations_total += 1
+
+    def on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.soft_invalidations_total += 1
+
+    def record_wait(self, seconds, timed_out):
+        with self._lock:
+            self.checkout_wait_seconds_total += seconds
+            if seconds > self.checkout_wait_seconds_max:
+                self.checkout_wait_seconds_max = seconds
+            if timed_out:
+                self.checkout_timeouts_total += 1
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self.connect_seconds_total += seconds
+            if seconds > self.connect_seconds_max:
+                self.connect_seconds_max = seconds
+
+    def listen(self, pool):
+        event.listen(pool, "connect", self.on_connect)
+        event.listen(pool, "checkout", self.on_checkout)
+        event.listen(pool, "close", self.on_close)
+        event.listen(pool, "invalidate", self.on_invalidate)
+        event.listen(pool, "soft_invalidate", self.on_soft_invalidate)
+
+    def snapshot(self, pool):
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - started for started in self._connected_at.values()]
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": DB_MAX_OVERFLOW,
+                "connects_total": self.connects_total,
+                "checkouts_total": self.checkouts_total,
+                "checkout_timeouts_total": self.checkout_timeouts_total,
+                "checkout_wait_seconds_total": round(
+                    self.checkout_wait_seconds_total, 6
+                ),
+                "checkout_wait_seconds_max": round(self.checkout_wait_seconds_max, 6),
+                "connect_seconds_total": round(self.connect_seconds_total, 6),
+                "connect_seconds_max": round(self.connect_seconds_max, 6),
+                "invalidations_total": self.invalidations_total,
+                "soft_invalidations_total": self.soft_invalidations_total,
+                "open_connections": len(ages),
+                "connection_age_seconds_max": round(max(ages, default=0), 3),
+                "connection_age_seconds_avg": (
+                    round(sum(ages) / len(ages), 3) if ages else 0
+                ),
+                "recycle_seconds": DB_POOL_RECYCLE,
+                "pre_ping": DB_POOL_PRE_PING,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool that also times how long a checkout waits for a connection.
+
+    Pool events only fire once a connection has been handed out, so the wait
+    itself is measured around the pool's internal get. QueuePool retries that
+    get recursively when it loses an overflow race, so only the outermost
+    call is timed, and the time spent opening a new connection is reported
+    separately instead of as waiting.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metering = threading.local()
+
+    def _do_get(self):
+        if getattr(self._metering, "active", False):
+            return super()._do_get()
+
+        self._metering.active = True
+        self._metering.connect_seconds = 0.0
+        started = time.monotonic()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._metering.active = False
+            waited = time.monotonic() - started - self._metering.connect_seconds
+            pool_metrics.record_wait(waited, timed_out)
+
+    def _create_connection(self):
+        started = time.monotonic()
+        try:
+            return super()._create_connection()
+        finally:
+            seconds = time.monotonic() - started
+            if getattr(self._metering, "active", False):
+                self._metering.connect_seconds += seconds
+            pool_metrics.record_connect(seconds)
+
+
 # Create the database engine
-engine = create_engine(f"{SQLALCHEMY_DATABASE_URL}")
+engine = create_engine(
+    f"{SQLALCHEMY_DATABASE_URL}",
+    poolclass=MeteredQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+pool_metrics.listen(engine.pool)
 
 # Create a session factory for database interactions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,258 @@
+"""
+Concurrent load test for the Video Catalog API.
+
+Starts the application from main.py (unless --url points at a running
+server) and drives a weighted mix of create, list, detail, edit and delete
+calls from many concurrent async clients. Clients are started gradually over
+the ramp-up period and the run stops after a fixed duration. Throughput and
+p50/p95/p99 latency of the successful requests are reported per endpoint;
+failed ones (e.g. 503 admission rejections) are counted per status instead.
+
+Example:
+    python loadtest.py --clients 50 --duration 60 --ramp-up 10 \\
+        --mix create=1,list=5,detail=10,edit=1,delete=1
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+import imageio_ffmpeg
+
+ENDPOINTS = ("create", "list", "detail", "edit", "delete")
+
+
+def parse_mix(mix):
+    """Parse "create=1,list=5" into a {endpoint: weight} dict."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+def make_sample_video():
+    """Render a short test clip with the bundled ffmpeg binary."""
+    path = os.path.join(tempfile.mkdtemp(), "loadtest.mp4")
+    subprocess.run(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", "testsrc=duration=2:size=320x240:rate=24",
+            "-pix_fmt", "yuv420p", path,
+        ],
+        check=True,
+    )
+    return path
+
+
+class LoadTest:
+    def __init__(self, base_url, weights, video, clients, duration, ramp_up, seed):
+        self.base_url = base_url
+        self.weights = weights
+        self.video = video
+        self.clients = clients
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.seed = seed
+        self.video_ids = []
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, client, endpoint):
+        """Run one request, recording its latency if it succeeded, else its error."""
+        if endpoint in ("detail", "edit", "delete") and not self.video_ids:
+            endpoint = "create"
+        video_id = random.choice(self.video_ids) if self.video_ids else None
+
+        started = time.perf_counter()
+        try:
+            if endpoint == "create":
+                response = await client.post(
+                    "/videocatalog/create/",
+                    data={"title": "load test", "description": "load test video"},
+                    files={"video": ("loadtest.mp4", self.video, "video/mp4")},
+                )
+            elif endpoint == "list":
+                page = random.randint(1, 5)
+                response = await client.get(f"/videocatalog/list/?page={page}")
+            elif endpoint == "detail":
+                response = await client.get(f"/videocatalog/detail/{video_id}")
+            elif endpoint == "edit":
+                response = await client.post(
+                    f"/videocatalog/edit/{video_id}/",
+                    data={"title": "load test edited", "description": "edited"},
+                )
+            else:
+                if video_id in self.video_ids:
+                    self.video_ids.remove(video_id)
+                response = await client.post(f"/videocatalog/delete/{video_id}/")
+        except httpx.HTTPError as exc:
+            self.errors[endpoint][type(exc).__name__] += 1
+            return
+
+        latency = time.perf_counter() - started
+
+        # The API reports failures in the body as well as the HTTP status
+        body_status = response.status_code
+        if response.status_code == 200:
+            body_status = response.json().get("status_code", 200)
+        if body_status != 200:
+            # Fast rejections would otherwise inflate throughput and hide the tail
+            self.errors[endpoint][str(body_status)] += 1
+            return
+
+        self.latencies[endpoint].append(latency)
+        if endpoint == "create":
+            self.video_ids.append(response.json()["data"]["id"])
+
+    async def user(self, client, start_delay, deadline):
+        await asyncio.sleep(start_delay)
+        names, weights = zip(*self.weights.items())
+        while time.monotonic() < deadline:
+            await self.call(client, random.choices(names, weights)[0])
+
+    async def run(self):
+        limits = httpx.Limits(max_connections=self.clients)
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=60, limits=limits
+        ) as client:
+            # Seed some videos so detail/edit/delete have targets from the start
+            for _ in range(self.seed):
+                await self.call(client, "create")
+            self.latencies.clear()
+            self.errors.clear()
+
+            started = time.monotonic()
+            deadline = started + self.duration
+            await asyncio.gather(
+                *(
+                    self.user(client, self.ramp_up * i / self.clients, deadline)
+                    for i in range(self.clients)
+                )
+            )
+            return time.monotonic() - started
+
+    def report(self, elapsed):
+        rows = {}
+        for endpoint in ENDPOINTS:
+            latencies = self.latencies.get(endpoint, [])
+            errors = dict(self.errors.get(endpoint, {}))
+            if not latencies and not errors:
+                continue
+            rows[endpoint] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "max_ms": round(max(latencies, default=0) * 1000, 2),
+            }
+        return {"elapsed_seconds": round(elapsed, 2), "endpoints": rows}
+
+
+def print_report(report):
+    print(f"\nElapsed: {report['elapsed_seconds']}s")
+    header = (
+        f"{'endpoint':<8} {'requests':>9} {'errors':>7} {'req/s':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in report["endpoints"].items():
+        print(
+            f"{endpoint:<8} {row['requests']:>9} {sum(row['errors'].values()):>7} "
+            f"{row['throughput_rps']:>8} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+            f"{row['p99_ms']:>9} {row['max_ms']:>9}"
+        )
+    for endpoint, row in report["endpoints"].items():
+        if row["errors"]:
+            print(f"{endpoint} errors: {row['errors']}")
+
+
+def start_server(host, port, workers):
+    """Start main:app with uvicorn and wait until it answers."""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", host, "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    base_url = f"http://{host}:{port}"
+    for _ in range(100):
+        if process.poll() is not None:
+            raise RuntimeError("The application exited during startup")
+        try:
+            httpx.get(f"{base_url}/videocatalog/list/", timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The application did not start in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--url", help="Target a running server instead of starting main.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds, ramp-up included")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds to start all clients")
+    parser.add_argument("--mix", default="create=1,list=5,detail=10,edit=1,delete=1")
+    parser.add_argument("--seed", type=int, default=10, help="Videos created before measuring")
+    parser.add_argument("--video", help="Video file to upload (a test clip is rendered if omitted)")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.video or make_sample_video(), "rb") as file:
+        video = file.read()
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        process, base_url = start_server(args.host, args.port, args.workers)
+
+    try:
+        load_test = LoadTest(
+            base_url, parse_mix(args.mix), video,
+            args.clients, args.duration, args.ramp_up, args.seed,
+        )
+        elapsed = asyncio.run(load_test.run())
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = load_test.report(elapsed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,14 @@
 import uvicorn
 from fastapi import APIRouter, FastAPI
 from starlette.config import Config
-from routers import video_catalog
+from routers import monitoring, video_catalog
+from src.api.archive import archive_purger
+from src.api.coalescer import write_coalescer
+from src.api.idempotency import idempotency_purger
+from src.api.profiling import MEMORY_PROFILING, memory_profiler
+from src.api.renditions import HLS_ENABLED, rendition_pipeline
 from src.api.schemas import ErrorResponse
+from src.api.storage import storage
 
 
 
@@ -38,6 +44,25 @@ app = FastAPI(
 # Include routers
 
 app.include_router(video_catalog.router)
+app.include_router(monitoring.router)
+
+# Profile memory of the selected routes when enabled
+if MEMORY_PROFILING:
+    app.middleware("http")(memory_profiler.middleware)
+
+# Run the storage tiering, archive purge and idempotency key purge threads and stop the HLS rendition workers
+# and the write coalescer with the application
+app.add_event_handler("startup", storage.start)
+app.add_event_handler("startup", archive_purger.start)
+app.add_event_handler("startup", idempotency_purger.start)
+# Transcoding jobs do not survive a restart; pick up the videos left pending
+if HLS_ENABLED:
+    app.add_event_handler("startup", rendition_pipeline.resume_pending)
+app.add_event_handler("shutdown", storage.stop)
+app.add_event_handler("shutdown", archive_purger.stop)
+app.add_event_handler("shutdown", idempotency_purger.stop)
+app.add_event_handler("shutdown", rendition_pipeline.shutdown)
+app.add_event_handler("shutdown", write_coalescer.stop)
 
 
 # Run the application
@@ -0,0 +1,140 @@
+"""
+Move existing video files into the sharded content layout.
+
+Files uploaded before the sharded layout sit directly under
+VIDEO_CONTENT_PATH under their client filename. This tool gives every live
+and archived video a server-assigned content key, one batch at a time, while
+the application keeps serving:
+
+1. the file is hard linked (or copied) to its new key, so both paths work;
+2. video_file is switched to the new path only if it still holds the old
+   one, so a concurrent edit wins, and each batch is one short transaction;
+3. old files no video refers to anymore are removed after the commit.
+
+Videos whose HLS renditions are still pending are skipped, because the
+rendition job matches on the old path; run the tool again later for them.
+
+Example:
+    python rehome_content.py --batch-size 200 --pause 0.5
+"""
+import argparse
+import os
+import time
+
+from starlette.config import Config
+
+from database import SessionLocal
+from src.api.changes import record_change
+from src.api.model import ArchivedVideo, Video
+from src.api.renditions import HLS_PENDING
+from src.api.storage import content_key, is_content_key, storage
+
+config = Config(".env")
+VIDEO_CONTENT_PATH = config("VIDEO_CONTENT_PATH")
+
+
+def legacy_key(video_file):
+    """Storage key of a file in the old flat layout, or None if there is nothing to move."""
+    key = os.path.relpath(video_file, VIDEO_CONTENT_PATH)
+    if key.startswith(os.pardir) or is_content_key(key):
+        return None
+    return key
+
+
+def is_referenced(db, video_file):
+    return any(
+        db.query(model.id).filter(model.video_file == video_file).first()
+        for model in (Video, ArchivedVideo)
+    )
+
+
+def rehome_batch(db, model, after_id, batch_size, dry_run=False):
+    """
+    Rehome the files of the next ``batch_size`` rows of ``model`` after ``after_id``.
+
+    Returns:
+        tuple: (last id scanned or None when done, {"moved": int, "skipped": int})
+    """
+    rows = (
+        db.query(model)
+        .filter(model.id > after_id, model.video_file.isnot(None))
+        .order_by(model.id)
+        .limit(batch_size)
+        .all()
+    )
+    counts = {"moved": 0, "skipped": 0}
+    if not rows:
+        return None, counts
+
+    replaced, changed = set(), []
+    for row in rows:
+        key = legacy_key(row.video_file)
+        if key is None:
+            continue
+        if row.hls_status == HLS_PENDING or storage.stat(key) is None:
+            counts["skipped"] += 1
+            continue
+        if dry_run:
+            counts["moved"] += 1
+            continue
+
+        new_key = content_key(key)
+        new_path = storage.copy(key, new_key)
+        updated = (
+            db.query(model)
+            .filter(model.id == row.id, model.video_file == row.video_file)
+            .update({"video_file": new_path}, synchronize_session=False)
+        )
+        if not updated:
+            # Edited (or deleted/restored) meanwhile; keep its new state
+            storage.delete(new_key)
+            counts["skipped"] += 1
+            continue
+        if model is Video:
+            changed.append(row.id)
+        replaced.add(row.video_file)
+        counts["moved"] += 1
+
+    # Recorded last, so the change feed lock is not held while copying files
+    for video_id in changed:
+        record_change(db, video_id, "update")
+    db.commit()
+
+    # Shared old files are removed once the last video using them has moved
+    for video_file in replaced:
+        if not is_referenced(db, video_file):
+            storage.delete(legacy_key(video_file))
+    return rows[-1].id, counts
+
+
+def rehome(db, model, batch_size, pause=0.0, dry_run=False):
+    totals = {"moved": 0, "skipped": 0}
+    after_id = 0
+    while True:
+        after_id, counts = rehome_batch(db, model, after_id, batch_size, dry_run)
+        if after_id is None:
+            return totals
+        for name, count in counts.items():
+            totals[name] += count
+        print(f"{model.__tablename__}: up to id {after_id}, {totals}")
+        time.sleep(pause)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--batch-size", type=int, default=100, help="Videos per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to wait between batches")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the files to move")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for model in (Video, ArchivedVideo):
+            totals = rehome(db, model, args.batch_size, args.pause, args.dry_run)
+            print(f"{model.__tablename__}: done, {totals}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import asyncio
+
+from fastapi import APIRouter, Response, status
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from starlette.config import Config
+
+from database import engine, pool_metrics
+from src.api.admission import read_limiter, upload_limiter
+from src.api.coalescer import write_coalescer
+from src.api.profiling import MEMORY_PROFILING, memory_profiler
+
+config = Config(".env")
+DB_READY_TIMEOUT = config("DB_READY_TIMEOUT", cast=float, default=5.0)
+
+router = APIRouter(
+    prefix="/monitoring",
+    tags=["Monitoring"],
+)
+
+
+@router.get("/admission/")
+async def get_admission_metrics():
+    """
+    Get the admission control metrics for each route class.
+
+    Reports in-flight requests, queue depth and rejection counters for the
+    upload and read limiters.
+    """
+    return {
+        "data": [upload_limiter.metrics(), read_limiter.metrics()],
+        "status_code": status.HTTP_200_OK,
+        "message": "success",
+        "error": None,
+    }
+
+
+@router.get("/pool/")
+async def get_pool_metrics():
+    """
+    Get the database connection pool metrics.
+
+    Reports checked-out and overflow connections, checkout wait time and
+    timeouts, connection age and invalidations, plus the pool settings.
+    """
+    return {
+        "data": pool_metrics.snapshot(engine.pool),
+        "status_code": status.HTTP_200_OK,
+        "message": "success",
+        "error": None,
+    }
+
+
+@router.get("/writes/")
+async def get_write_metrics():
+    """
+    Get the group commit metrics for video inserts.
+
+    Reports the number of batches and rows, the largest and average batch,
+    batches that had to be retried row by row, and inserts waiting in the queue.
+    """
+    return {
+        "data": write_coalescer.metrics(),
+        "status_code": status.HTTP_200_OK,
+        "message": "success",
+        "error": None,
+    }
+
+
+def _check_connection():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+@router.get("/ready/")
+async def get_readiness(response: Response = None):
+    """
+    Readiness probe: check that the pool can hand out a working connection.
+
+    Responds with HTTP 503 when no connection could be checked out and used
+    within DB_READY_TIMEOUT seconds.
+    """
+    try:
+        await asyncio.wait_for(run_in_threadpool(_check_connection), DB_READY_TIMEOUT)
+    except Exception as e:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {
+            "data": None,
+            "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+            "message": "failed",
+            "error": str(e) or type(e).__name__,
+        }
+    return {
+        "data": None,
+        "status_code": status.HTTP_200_OK,
+        "message": "success",
+        "error": None,
+    }
+
+
+@router.get("/memory/")
+async def get_memory_profile():
+    """
+    Get the memory profile of the profiled routes (debug).
+
+    Returns the recent per-request records (peak and net allocation, top
+    allocation sites) and the worst/average peak per route. Records are only
+    collected when MEMORY_PROFILING is enabled.
+    """
+    return {
+        "data": {
+            "enabled": MEMORY_PROFILING,
+            "routes": memory_profiler.summary(),
+            "records": list(memory_profiler.records),
+        },
+        "status_code": status.HTTP_200_OK,
+        "message": "success",
+        "error": None,
+    }
@@ -1,8 +1,27 @@
-from fastapi import APIRouter, Depends, Query, Request, Response, status
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from database import get_db
-from src.api.sevice import VideoCatalogService
+from src.api.admission import admitted, read_admission, upload_admission, upload_limiter
+from src.api.idempotency import IdempotencyService
+from src.api.sevice import DETAIL_CACHE_MAX_AGE, VideoCatalogService
+from src.api.upload import read_upload_form
 
 router = APIRouter(
     prefix="/videocatalog",
@@ -16,27 +35,71 @@ async def create_video(
     response: Response = None,
     request: Request = None,
     db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
     """
     Create a new video in the video catalog.
 
     It extracts the video file from the request form, instantiates the VideoCatalogService,
-    and calls the create_new_video method.
+    and calls the create_new_video method. Uploads that are too large or are not a
+    known video container are rejected while the form is still streaming in.
 
+    When an Idempotency-Key header is sent, the first response for that key is
+    stored and replayed to retries (including ones arriving while the first
+    request is still running) without reading, writing or probing the upload again.
+    Replays and retries waiting for the first request do not take an upload slot.
     """
+    idempotency = None
     try:
-        # Extract the video file from the request form
-        video_form = await request.form()
-        video = video_form.get("video")
-        video_contents = None
-        if video:
-            video_contents = await video.read()
+        if idempotency_key:
+            # Replay the stored response if another request already owns this key
+            idempotency = IdempotencyService(db)
+            stored, replayed = await idempotency.begin(idempotency_key)
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+            if stored is not None:
+                return stored
+
+        # Only the request doing the work holds an upload slot
+        async with admitted(upload_limiter):
+            # Extract the video file from the request form, rejecting bad uploads early
+            video_form, message = await read_upload_form(request)
+            if video_form is None:
+                result = {
+                    "data": None,
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": message,
+                    "error": None,
+                }
+            else:
+                video = video_form.get("video")
+                video_contents = None
+                if video:
+                    video_contents = await video.read()
+
+                # Instantiate the VideoCatalogService and call the create_new_video method.
+                # Storing, probing and committing (or waiting for a group commit) block,
+                # so they run in the threadpool and reads keep being served meanwhile.
+                video_service = VideoCatalogService(request, response, db)
+                result = await run_in_threadpool(
+                    video_service.create_new_video, video_form, video_contents
+                )
+
+        if idempotency:
+            return idempotency.complete(idempotency_key, result)
+        return result
 
-        # Instantiate the VideoCatalogService and call the create_new_video method
-        video_service = VideoCatalogService(request, response, db)
-        return video_service.create_new_video(video_form, video_contents)
+    except HTTPException:
+        # Not admitted; free the key so the retry can take it
+        if idempotency:
+            idempotency.release(idempotency_key)
+        raise
 
     except Exception as e:
+        # Free the key so a retry can redo the work
+        if idempotency:
+            idempotency.release(idempotency_key)
+
         # Return an error response if an exception occurs
         return {
             "data": None,
@@ -46,25 +109,115 @@ async def create_video(
         }
 
 
-@router.get("/list/")
+@router.get("/list/", dependencies=[Depends(read_admission)])
 async def get_video_list(
     response: Response = None,
     request: Request = None,
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1),  # Added a query parameter for the page number
     limit: int = Query(10, ge=1, le=100),  # Added a query parameter for the limit
+    min_duration: Optional[int] = Query(None, ge=0),
+    max_duration: Optional[int] = Query(None, ge=0),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    updated_after: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+    sort_by: str = Query("id", pattern="^(id|created_at|updated_at|duration)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
 ):
     """
     Get a list of videos from the video catalog with pagination.
+
+    Videos can be filtered by a duration range and created/updated time windows
+    (lower bound inclusive, upper bound exclusive) and sorted by any of
+    id, created_at, updated_at or duration. Ties are broken by id in the same
+    direction, so the order is stable across pages.
     """
     
     offset = (page - 1) * limit  # Calculate the offset based on the page number
 
+    filters = {
+        "min_duration": min_duration,
+        "max_duration": max_duration,
+        "created_after": created_after,
+        "created_before": created_before,
+        "updated_after": updated_after,
+        "updated_before": updated_before,
+    }
+
     video_service = VideoCatalogService(response, request, db)
-    return video_service.video_list(limit=limit, offset=offset)
+    return video_service.video_list(
+        limit=limit, offset=offset, filters=filters, sort_by=sort_by, order=order
+    )
+
 
+@router.get("/changes/", dependencies=[Depends(read_admission)])
+async def get_video_changes(
+    response: Response = None,
+    request: Request = None,
+    db: Session = Depends(get_db),
+    since: int = Query(0, ge=0, description="Cursor returned by the previous call"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Get the changes to the video catalog after a cursor.
+
+    Each change has a monotonically increasing seq, the operation (create,
+    update or delete) and the current video, which is null for deleted videos
+    (tombstones). A restored video appears as a new create. Pass next_cursor
+    as since to continue; has_more tells whether to call again right away.
+    """
+    video_service = VideoCatalogService(response, request, db)
+    return video_service.video_changes(since, limit)
+
+
+@router.get("/stats/", dependencies=[Depends(read_admission)])
+async def get_catalog_stats(
+    response: Response = None,
+    request: Request = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Get the catalog totals: number of videos, total duration in seconds and
+    the number of videos per HLS status.
+    """
+    video_service = VideoCatalogService(response, request, db)
+    return video_service.catalog_stats()
+
+
+@router.get("/detail/", dependencies=[Depends(read_admission)])
+async def get_video_detail_batch(
+    response: Response = None,
+    request: Request = None,
+    db: Session = Depends(get_db),
+    ids: str = Query(..., description="Comma separated video IDs, e.g. 1,2,3"),
+):
+    """
+    Get the details of several videos from the video catalog in one request.
 
-@router.get("/detail/{id}")
+    Videos are returned in the requested order and IDs that do not exist are
+    listed in not_found. The response carries an ETag, so clients and caches
+    can revalidate it with If-None-Match and get a 304 when nothing changed.
+    """
+    video_service = VideoCatalogService(response, request, db)
+    result = video_service.video_detail_batch(ids)
+    if result["status_code"] != status.HTTP_200_OK:
+        return result
+
+    body = jsonable_encoder(result)
+    digest = hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()
+    headers = {
+        "ETag": f'"{digest}"',
+        "Cache-Control": f"max-age={DETAIL_CACHE_MAX_AGE}",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return body
+
+
+@router.get("/detail/{id}", dependencies=[Depends(read_admission)])
 async def get_video_detail(
     id: int,
     response: Response = None,
@@ -78,6 +231,22 @@ async def get_video_detail(
     return video_service.video_detail(id)
 
 
+@router.get("/stream/{id}")
+async def stream_video(
+    id: int,
+    response: Response = None,
+    request: Request = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Stream the original file of a video through the storage backend.
+
+    Files that were moved to the cold tier are brought back to the hot tier first.
+    """
+    video_service = VideoCatalogService(response, request, db)
+    return video_service.video_stream(id)
+
+
 @router.post("/delete/{id}/")
 async def delete_video(
     id: int,
@@ -87,12 +256,29 @@ async def delete_video(
 ):
     """
     Delete a video from the video catalog.
+
+    The video is moved to the archive and can be restored until it is purged
+    after ARCHIVE_RETENTION seconds.
     """
     video_service = VideoCatalogService(response, request, db)
     return video_service.delete_video(id)
 
 
-@router.post("/edit/{id}/")
+@router.post("/restore/{id}/")
+async def restore_video(
+    id: int,
+    response: Response = None,
+    request: Request = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Restore a deleted video from the archive under its original id.
+    """
+    video_service = VideoCatalogService(response, request, db)
+    return video_service.restore_video(id)
+
+
+@router.post("/edit/{id}/", dependencies=[Depends(upload_admission)])
 async def update_video(
     id: int,
     response: Response = None,
@@ -105,13 +291,23 @@ async def update_video(
     It extracts the video file from the request form, instantiates the VideoCatalogService,
     and calls the edit_video method.
     """
-    # Extract the video file from the request form
-    video_form = await request.form()
+    # Extract the video file from the request form, rejecting bad uploads early
+    video_form, message = await read_upload_form(request)
+    if video_form is None:
+        return {
+            "data": None,
+            "status_code": status.HTTP_400_BAD_REQUEST,
+            "message": message,
+            "error": None,
+        }
+
     video_contents = None
     if video_form.get("video"):
         video_content = video_form.get("video")
         video_contents = await video_content.read()
 
-    # Instantiate the VideoCatalogService and call the edit_video method
+    # Instantiate the VideoCatalogService and call the edit_video method off the event loop
     video_service = VideoCatalogService(response, request, db)
-    return video_service.edit_video(id, video_form, video_contents)
+    return await run_in_threadpool(
+        video_service.edit_video, id, video_form, video_contents
+    )
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+from starlette.config import Config
+
+config = Config(".env")
+UPLOAD_MAX_CONCURRENCY = config("UPLOAD_MAX_CONCURRENCY", cast=int, default=4)
+UPLOAD_MAX_QUEUE = config("UPLOAD_MAX_QUEUE", cast=int, default=8)
+UPLOAD_QUEUE_TIMEOUT = config("UPLOAD_QUEUE_TIMEOUT", cast=float, default=10.0)
+READ_MAX_CONCURRENCY = config("READ_MAX_CONCURRENCY", cast=int, default=64)
+READ_MAX_QUEUE = config("READ_MAX_QUEUE", cast=int, default=128)
+READ_QUEUE_TIMEOUT = config("READ_QUEUE_TIMEOUT", cast=float, default=2.0)
+ADMISSION_RETRY_AFTER = config("ADMISSION_RETRY_AFTER", cast=int, default=5)
+
+
+class ConcurrencyLimiter:
+    """
+    Limit how many requests of one route class run at once.
+
+    Requests over the limit wait in a bounded FIFO queue for up to
+    ``queue_timeout`` seconds. When the queue is full or the wait times out
+    the request is rejected, so overload turns into quick 503s instead of
+    unbounded memory and disk pressure.
+    """
+
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.peak_queue_depth = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.queue_wait_seconds_total = 0.0
+        self._waiters = deque()
+
+    async def acquire(self):
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Returns:
+            bool: True if the request was admitted, False if it was rejected.
+        """
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted_total += 1
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_total += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.peak_queue_depth = max(self.peak_queue_depth, len(self._waiters))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # The client went away while queued; give back a slot handed to it
+            if waiter.done():
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            self.queue_wait_seconds_total += time.monotonic() - started
+
+        if waiter.done():
+            # release() handed its slot over to this waiter
+            self.admitted_total += 1
+            return True
+
+        waiter.cancel()
+        self._waiters.remove(waiter)
+        self.rejected_total += 1
+        return False
+
+    def release(self):
+        """Free a slot, handing it straight to the oldest waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def metrics(self):
+        return {
+            "name": self.name,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "peak_queue_depth": self.peak_queue_depth,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "queue_wait_seconds_total": round(self.queue_wait_seconds_total, 6),
+        }
+
+
+upload_limiter = ConcurrencyLimiter(
+    "upload", UPLOAD_MAX_CONCURRENCY, UPLOAD_MAX_QUEUE, UPLOAD_QUEUE_TIMEOUT
+)
+read_limiter = ConcurrencyLimiter(
+    "read", READ_MAX_CONCURRENCY, READ_MAX_QUEUE, READ_QUEUE_TIMEOUT
+)
+
+
+async def _admit(limiter):
+    if not await limiter.acquire():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Too many concurrent {limiter.name} requests, retry later",
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)},
+        )
+
+
+@asynccontextmanager
+async def admitted(limiter):
+    """Hold a slot of ``limiter`` for the block, rejecting with 503 like the dependencies."""
+    await _admit(limiter)
+    try:
+        yield
+    finally:
+        limiter.release()
+
+
+async def upload_admission():
+    """Dependency guarding the upload routes (edit; create takes its slot itself)."""
+    async with admitted(upload_limiter):
+        yield
+
+
+async def read_admission():
+    """Dependency guarding the read routes (list / detail)."""
+    async with admitted(read_limiter):
+        yield
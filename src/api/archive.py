@@ -0,0 +1,117 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from starlette.config import Config
+
+from database import SessionLocal
+from src.api.model import ArchivedVideo, Video
+from src.api.renditions import remove_renditions
+from src.api.storage import storage
+
+logger = logging.getLogger(__name__)
+
+config = Config(".env")
+# Seconds a deleted video is kept in the archive before it is purged
+ARCHIVE_RETENTION = config("ARCHIVE_RETENTION", cast=int, default=90 * 86400)
+ARCHIVE_PURGE_INTERVAL = config("ARCHIVE_PURGE_INTERVAL", cast=int, default=3600)
+ARCHIVE_PURGE_BATCH = config("ARCHIVE_PURGE_BATCH", cast=int, default=500)
+
+
+class ArchivePurger:
+    """
+    Background job that purges archived videos past the retention period.
+
+    Rows are deleted in batches, each in its own short transaction, so the
+    purge never holds many locks or a long-running transaction. The stored
+    file and HLS renditions of a purged video are removed after its batch
+    commits, unless another video still refers to the same file.
+    """
+
+    def __init__(self, retention, interval, batch_size):
+        self.retention = retention
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def purge(self, db):
+        """
+        Delete archived videos deleted more than ``retention`` seconds ago.
+
+        Returns:
+            int: Number of archived videos purged.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention)
+        purged = 0
+        while True:
+            # Rows locked by a concurrent restore are skipped, not waited for
+            rows = (
+                db.query(ArchivedVideo)
+                .filter(ArchivedVideo.deleted_at < cutoff)
+                .order_by(ArchivedVideo.deleted_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                break
+
+            ids = [row.id for row in rows]
+            files = {row.video_file for row in rows if row.video_file}
+            playlists = [row.hls_playlist for row in rows if row.hls_playlist]
+            db.query(ArchivedVideo).filter(ArchivedVideo.id.in_(ids)).delete(
+                synchronize_session=False
+            )
+            # Files can be shared by videos uploaded under the same name
+            shared = {
+                video_file
+                for model in (Video, ArchivedVideo)
+                for (video_file,) in db.query(model.video_file).filter(
+                    model.video_file.in_(files)
+                )
+            }
+            db.commit()
+
+            for video_file in files - shared:
+                # Old rows may point outside the content directory; never delete those
+                key = storage.key(video_file)
+                if key is not None:
+                    storage.delete(key)
+            for playlist in playlists:
+                remove_renditions(playlist)
+
+            purged += len(rows)
+            if len(rows) < self.batch_size:
+                break
+        return purged
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            db = SessionLocal()
+            try:
+                self.purge(db)
+            except Exception:
+                logger.exception("Archive purge failed")
+            finally:
+                db.close()
+
+    def start(self):
+        """Start the background purge thread."""
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="archive-purge", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+
+archive_purger = ArchivePurger(
+    ARCHIVE_RETENTION, ARCHIVE_PURGE_INTERVAL, ARCHIVE_PURGE_BATCH
+)
@@ -0,0 +1,32 @@
+from sqlalchemy import func, select
+
+from src.api.model import VideoChange
+
+# Transaction-level advisory lock serializing the change feed writers
+CHANGE_FEED_LOCK = 0x76636866  # "vchf"
+
+
+def lock_change_feed(db):
+    """
+    Hold the change feed lock until the current transaction ends.
+
+    ``seq`` comes from a sequence when the change row is inserted, which
+    does not follow the order in which transactions commit. With every
+    writer inserting its change rows under this lock, a transaction can only
+    take a seq after all lower ones have committed or rolled back, so a
+    reader that sees a change has already seen every committed change before
+    it.
+
+    Flushes pending work first: once the lock is held the transaction only
+    inserts change rows and commits, so it never waits for a row lock while
+    other writers wait for it. The lock still serializes the commits of all
+    catalog writes, which bounds write throughput to one commit at a time.
+    """
+    db.flush()
+    db.execute(select(func.pg_advisory_xact_lock(CHANGE_FEED_LOCK)))
+
+
+def record_change(db, video_id, operation):
+    """Append to the change feed; the caller must commit right after."""
+    lock_change_feed(db)
+    db.add(VideoChange(video_id=video_id, operation=operation))
@@ -0,0 +1,172 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import insert
+from starlette.config import Config
+
+from database import SessionLocal
+from src.api.changes import lock_change_feed
+from src.api.model import Video, VideoChange
+from src.api.stats import apply_stats_delta, status_delta
+
+logger = logging.getLogger(__name__)
+
+config = Config(".env")
+WRITE_COALESCING = config("WRITE_COALESCING", cast=bool, default=False)
+# Seconds the first insert of a batch waits for others to join it
+WRITE_COALESCE_WINDOW = config("WRITE_COALESCE_WINDOW", cast=float, default=0.005)
+WRITE_COALESCE_MAX_BATCH = config("WRITE_COALESCE_MAX_BATCH", cast=int, default=64)
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+
+class WriteCoalescer:
+    """
+    Group commit for video inserts from concurrent requests.
+
+    Callers hand over the column values of a new video and block until it is
+    stored. A single writer thread collects inserts for up to ``window``
+    seconds or ``max_batch`` rows, then stores them with one multi-row
+    ``INSERT ... RETURNING`` plus their change feed rows and stats in one
+    transaction, so a burst costs one commit instead of one per video. If
+    the batch fails, its rows are retried one by one so each caller gets
+    its own row or its own error.
+    """
+
+    def __init__(self, window, max_batch, session_factory=SessionLocal):
+        self.window = window
+        self.max_batch = max_batch
+        self.session_factory = session_factory
+        self.batches_total = 0
+        self.rows_total = 0
+        self.batch_retries_total = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def insert(self, values):
+        """
+        Store a video as part of the next batch.
+
+        Returns:
+            dict: The column values of the stored row, including id and timestamps.
+        """
+        future = Future()
+        self._start()
+        self._queue.put((values, future))
+        return future.result()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="write-coalescer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._flush(batch)
+            except Exception as e:
+                logger.exception("Write batch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _insert(self, db, rows):
+        # Core insert, so RETURNING rows come back in the order of the batch
+        result = db.execute(
+            insert(Video.__table__).returning(
+                *Video.__table__.columns, sort_by_parameter_order=True
+            ),
+            rows,
+        )
+        stored = [dict(row._mapping) for row in result]
+        deltas = {
+            "total_videos": len(stored),
+            "total_duration": sum(row["duration"] or 0 for row in stored),
+        }
+        for row in stored:
+            for column, delta in status_delta(None, row["hls_status"]).items():
+                deltas[column] = deltas.get(column, 0) + delta
+        apply_stats_delta(db, **deltas)
+        lock_change_feed(db)
+        db.execute(
+            insert(VideoChange.__table__),
+            [{"video_id": row["id"], "operation": "create"} for row in stored],
+        )
+        db.commit()
+        return stored
+
+    def _flush(self, batch):
+        db = self.session_factory()
+        try:
+            try:
+                stored = self._insert(db, [values for values, _ in batch])
+            except Exception:
+                db.rollback()
+                self.batch_retries_total += 1
+                # One bad row fails the whole statement; give every caller its own outcome
+                for values, future in batch:
+                    try:
+                        (row,) = self._insert(db, [values])
+                    except Exception as e:
+                        db.rollback()
+                        future.set_exception(e)
+                    else:
+                        future.set_result(row)
+                return
+            finally:
+                self.batches_total += 1
+                self.rows_total += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+
+            for (_, future), row in zip(batch, stored):
+                future.set_result(row)
+        finally:
+            db.close()
+
+    def metrics(self):
+        return {
+            "enabled": WRITE_COALESCING,
+            "batches_total": self.batches_total,
+            "rows_total": self.rows_total,
+            "batch_retries_total": self.batch_retries_total,
+            "largest_batch": self.largest_batch,
+            "average_batch": (
+                round(self.rows_total / self.batches_total, 2) if self.batches_total else 0
+            ),
+            "queued": self._queue.qsize(),
+        }
+
+    def stop(self):
+        """Store what is already queued and stop the writer thread."""
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+
+write_coalescer = WriteCoalescer(WRITE_COALESCE_WINDOW, WRITE_COALESCE_MAX_BATCH)
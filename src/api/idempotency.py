@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from starlette.config import Config
+
+from database import SessionLocal
+from src.api.model import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+config = Config(".env")
+# How long a completed response is replayed for the same key
+IDEMPOTENCY_TTL = config("IDEMPOTENCY_TTL", cast=int, default=86400)
+# How long an in-progress claim is honoured before another request may take over
+IDEMPOTENCY_LOCK_TIMEOUT = config("IDEMPOTENCY_LOCK_TIMEOUT", cast=int, default=300)
+# How long a retry waits for an in-flight request with the same key to finish
+IDEMPOTENCY_WAIT_TIMEOUT = config("IDEMPOTENCY_WAIT_TIMEOUT", cast=float, default=10.0)
+IDEMPOTENCY_POLL_INTERVAL = 0.2
+IDEMPOTENCY_PURGE_INTERVAL = config("IDEMPOTENCY_PURGE_INTERVAL", cast=int, default=3600)
+IDEMPOTENCY_PURGE_BATCH = config("IDEMPOTENCY_PURGE_BATCH", cast=int, default=1000)
+
+
+class IdempotencyService:
+    def __init__(self, db):
+        self.db = db
+
+    def claim(self, key):
+        """
+        Try to become the request that does the work for this key.
+
+        Returns:
+            bool: True if the key was claimed, False if another request owns it.
+        """
+        now = datetime.now(timezone.utc)
+
+        # Drop an expired record (finished or abandoned) so the key can be reused
+        self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.key == key, IdempotencyKey.expires_at < now
+        ).delete(synchronize_session=False)
+
+        stmt = (
+            insert(IdempotencyKey)
+            .values(
+                key=key,
+                status="in_progress",
+                expires_at=now + timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT),
+            )
+            .on_conflict_do_nothing(index_elements=["key"])
+            .returning(IdempotencyKey.key)
+        )
+        claimed = self.db.execute(stmt).first() is not None
+        self.db.commit()
+        return claimed
+
+    async def begin(self, key):
+        """
+        Claim the key, or wait for the stored response of the request owning it.
+
+        Returns:
+            tuple: (response, replayed). The response is None if this request
+            owns the key; otherwise it is the stored response (replayed is
+            True) or a 409 once the owner does not finish in time.
+        """
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            # The queries block, so each poll runs in the threadpool
+            if await run_in_threadpool(self.claim, key):
+                return None, False
+
+            stored = await run_in_threadpool(self.lookup, key)
+            if stored is not None:
+                return stored, True
+
+            if time.monotonic() >= deadline:
+                return {
+                    "data": None,
+                    "status_code": status.HTTP_409_CONFLICT,
+                    "message": "A request with this Idempotency-Key is still in progress",
+                    "error": None,
+                }, False
+
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+
+    def lookup(self, key):
+        """
+        Stored response for a key owned by another request.
+
+        Returns:
+            dict | None: The response, or None while the owner is still running.
+        """
+        record = self.db.query(IdempotencyKey).filter_by(key=key).first()
+        stored = record.response if record and record.status == "completed" else None
+
+        # End the read transaction so the next poll sees the owner's commit
+        self.db.commit()
+        return stored
+
+    def complete(self, key, result):
+        """
+        Store the response for replay, or free the key if the request failed.
+
+        Returns:
+            dict: The JSON-encoded response, identical to what a retry will get.
+        """
+        response = jsonable_encoder(result)
+        if result["status_code"] >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+            self.release(key)
+            return response
+
+        self.db.query(IdempotencyKey).filter_by(key=key).update(
+            {
+                "status": "completed",
+                "response": response,
+                "expires_at": datetime.now(timezone.utc)
+                + timedelta(seconds=IDEMPOTENCY_TTL),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+        return response
+
+    def release(self, key):
+        """Free the key so a retry can redo the work."""
+        self.db.rollback()
+        self.db.query(IdempotencyKey).filter_by(key=key).delete(
+            synchronize_session=False
+        )
+        self.db.commit()
+
+
+class IdempotencyPurger:
+    """
+    Background job that deletes expired idempotency keys.
+
+    Clients send a new key for every request, so an expired key is rarely
+    reused (which would delete it in ``claim``); without this job the table
+    keeps every stored response forever. Keys are deleted in batches, each in
+    its own short transaction.
+    """
+
+    def __init__(self, interval, batch_size):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def purge(self, db):
+        """
+        Delete idempotency keys whose ``expires_at`` has passed.
+
+        Returns:
+            int: Number of keys deleted.
+        """
+        now = datetime.now(timezone.utc)
+        purged = 0
+        while True:
+            # Keys being claimed again right now are skipped, not waited for
+            expired = (
+                db.query(IdempotencyKey.key)
+                .filter(IdempotencyKey.expires_at < now)
+                .order_by(IdempotencyKey.expires_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            deleted = (
+                db.query(IdempotencyKey)
+                .filter(IdempotencyKey.key.in_(expired))
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+
+            purged += deleted
+            if deleted < self.batch_size:
+                break
+        return purged
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            db = SessionLocal()
+            try:
+                self.purge(db)
+            except Exception:
+                logger.exception("Idempotency key purge failed")
+            finally:
+                db.close()
+
+    def start(self):
+        """Start the background purge thread."""
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="idempotency-purge", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+
+idempotency_purger = IdempotencyPurger(
+    IDEMPOTENCY_PURGE_INTERVAL, IDEMPOTENCY_PURGE_BATCH
+)
@@ -1,4 +1,14 @@
-from sqlalchemy import TIMESTAMP, Column, Integer, String, text
+from sqlalchemy import (
+    JSON,
+    TIMESTAMP,
+    BigInteger,
+    Column,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
 
 from database import Base
 
@@ -15,6 +25,94 @@ class Video(Base):
     created_at = Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
+    # Set on every ORM update; the statement time (not the transaction start)
+    # keeps several updates in one transaction in order
     updated_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=func.statement_timestamp(),
+    )
+    hls_status = Column(String(20))  # None, "pending", "ready" or "failed"
+    hls_playlist = Column(String)
+
+    # Composite indexes backing the filtered and sorted list endpoint. The
+    # trailing id keeps every sort order stable, so each page is a range scan.
+    __table_args__ = (
+        Index("ix_videos_created_at_id", "created_at", "id"),
+        Index("ix_videos_updated_at_id", "updated_at", "id"),
+        Index("ix_videos_duration_id", "duration", "id"),
+    )
+
+
+class ArchivedVideo(Base):
+    """
+    Soft-deleted video, moved out of ``videos`` in the same transaction as the delete.
+
+    Keeps the original id and columns so the video can be restored as it was.
+    Rows older than the archive retention are purged in batches.
+    """
+
+    __tablename__ = "archived_videos"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(100))
+    description = Column(String(500))
+    video_file = Column(String)
+    duration = Column(Integer)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    hls_status = Column(String(20))
+    hls_playlist = Column(String)
+    deleted_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        index=True,
+    )
+
+
+class IdempotencyKey(Base):
+    """Stored outcome of a request made with an Idempotency-Key header."""
+
+    __tablename__ = "idempotency_keys"
+    key = Column(String(255), primary_key=True)
+    status = Column(String(20), nullable=False)  # "in_progress" or "completed"
+    response = Column(JSON)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+
+
+class VideoChange(Base):
+    """
+    Append-only change log of the videos table, read by the change feed.
+
+    ``seq`` is the feed cursor; rows are written under the change feed lock, so
+    seq follows commit order.
+    """
+
+    __tablename__ = "video_changes"
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    video_id = Column(Integer, nullable=False, index=True)
+    operation = Column(String(10), nullable=False)  # "create", "update" or "delete"
+    changed_at = Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
+
+
+class CatalogStats(Base):
+    """
+    Running catalog totals, kept up to date in the same transaction as each change.
+
+    The totals are spread over a few slot rows so concurrent writers rarely
+    wait on the same row lock; the catalog totals are the sum over all slots.
+    """
+
+    __tablename__ = "catalog_stats"
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    total_videos = Column(BigInteger, nullable=False, server_default=text("0"))
+    total_duration = Column(BigInteger, nullable=False, server_default=text("0"))
+    hls_pending = Column(BigInteger, nullable=False, server_default=text("0"))
+    hls_ready = Column(BigInteger, nullable=False, server_default=text("0"))
+    hls_failed = Column(BigInteger, nullable=False, server_default=text("0"))
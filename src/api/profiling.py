@@ -0,0 +1,134 @@
+import asyncio
+import json
+import time
+import tracemalloc
+from collections import deque
+
+from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
+
+config = Config(".env")
+MEMORY_PROFILING = config("MEMORY_PROFILING", cast=bool, default=False)
+# Path prefixes of the routes to profile
+MEMORY_PROFILE_ROUTES = config(
+    "MEMORY_PROFILE_ROUTES",
+    cast=CommaSeparatedStrings,
+    default="/videocatalog/create/,/videocatalog/edit/",
+)
+MEMORY_PROFILE_TOP = config("MEMORY_PROFILE_TOP", cast=int, default=10)
+MEMORY_PROFILE_FRAMES = config("MEMORY_PROFILE_FRAMES", cast=int, default=1)
+MEMORY_PROFILE_HISTORY = config("MEMORY_PROFILE_HISTORY", cast=int, default=100)
+MEMORY_PROFILE_REPORT = config("MEMORY_PROFILE_REPORT", default="memory_profile.jsonl")
+
+# Allocations made by tracemalloc itself and the import machinery are noise
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class MemoryProfiler:
+    """
+    Per-request memory profile of selected routes using tracemalloc.
+
+    For every profiled request it records the peak traced memory above the
+    level at request start, the net change, and the top allocation sites
+    still alive when the response is ready. Profiled requests run one at a
+    time so their peaks are not mixed. Tracing only runs while a profiled
+    request does, so other routes are only slowed down (and their
+    allocations counted too) during one.
+    """
+
+    def __init__(self, routes, top, frames, history, report_path):
+        self.routes = tuple(routes)
+        self.top = top
+        self.frames = frames
+        self.report_path = report_path
+        self.records = deque(maxlen=history)
+        self._lock = asyncio.Lock()
+
+    def is_profiled(self, path):
+        return path.startswith(self.routes)
+
+    async def middleware(self, request, call_next):
+        if not self.is_profiled(request.url.path):
+            return await call_next(request)
+
+        async with self._lock:
+            # Leave tracing on only if it was started outside the profiler
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(self.frames)
+            before = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            start_current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+
+            response = await call_next(request)
+
+            elapsed = time.perf_counter() - started
+            end_current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.record(
+            request,
+            response,
+            peak_bytes=peak - start_current,
+            net_bytes=end_current - start_current,
+            elapsed=elapsed,
+            before=before,
+            after=after,
+        )
+        return response
+
+    def record(self, request, response, peak_bytes, net_bytes, elapsed, before, after):
+        top_sites = [
+            {
+                "site": str(stat.traceback),
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+            }
+            for stat in after.compare_to(before, "lineno")[: self.top]
+        ]
+        record = {
+            "timestamp": time.time(),
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "elapsed_seconds": round(elapsed, 6),
+            "peak_bytes": peak_bytes,
+            "net_bytes": net_bytes,
+            "top_allocations": top_sites,
+        }
+        self.records.append(record)
+        if self.report_path:
+            with open(self.report_path, "a") as report:
+                report.write(json.dumps(record) + "\n")
+        return record
+
+    def summary(self):
+        """Worst and average peak per route over the kept history."""
+        routes = {}
+        for record in self.records:
+            route = routes.setdefault(
+                record["path"],
+                {"requests": 0, "peak_bytes_max": 0, "peak_bytes_total": 0},
+            )
+            route["requests"] += 1
+            route["peak_bytes_max"] = max(route["peak_bytes_max"], record["peak_bytes"])
+            route["peak_bytes_total"] += record["peak_bytes"]
+        for route in routes.values():
+            route["peak_bytes_avg"] = route.pop("peak_bytes_total") // route["requests"]
+        return routes
+
+
+memory_profiler = MemoryProfiler(
+    MEMORY_PROFILE_ROUTES,
+    MEMORY_PROFILE_TOP,
+    MEMORY_PROFILE_FRAMES,
+    MEMORY_PROFILE_HISTORY,
+    MEMORY_PROFILE_REPORT,
+)
@@ -0,0 +1,231 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import imageio_ffmpeg
+from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
+
+from database import SessionLocal
+from src.api.changes import record_change
+from src.api.model import Video
+from src.api.stats import apply_stats_delta, status_delta
+from src.api.storage import content_key, storage
+
+logger = logging.getLogger(__name__)
+
+config = Config(".env")
+VIDEO_CONTENT_PATH = config("VIDEO_CONTENT_PATH")
+HLS_ENABLED = config("HLS_ENABLED", cast=bool, default=False)
+HLS_WORKERS = config("HLS_WORKERS", cast=int, default=2)
+HLS_CONTENT_PATH = config(
+    "HLS_CONTENT_PATH", default=os.path.join(VIDEO_CONTENT_PATH, "hls")
+)
+HLS_SEGMENT_SECONDS = config("HLS_SEGMENT_SECONDS", cast=int, default=6)
+# Rendition ladder as "<height>:<video kbps>:<audio kbps>" entries
+HLS_LADDER = config(
+    "HLS_LADDER",
+    cast=CommaSeparatedStrings,
+    default="360:800:96,720:2800:128,1080:5000:192",
+)
+
+HLS_PENDING = "pending"
+HLS_READY = "ready"
+HLS_FAILED = "failed"
+
+
+def parse_ladder(ladder):
+    """Turn HLS_LADDER entries into (height, video kbps, audio kbps) tuples, lowest first."""
+    return sorted(tuple(int(part) for part in rung.split(":")) for rung in ladder)
+
+
+def remove_renditions(playlist):
+    """Remove the job directory holding a master playlist and its renditions."""
+    if playlist:
+        shutil.rmtree(os.path.dirname(playlist), ignore_errors=True)
+
+
+def transcode_hls(source_path, output_dir, ladder):
+    """
+    Transcode a video into HLS renditions plus a master playlist.
+
+    Runs in a worker process of the rendition pool. Rungs taller than the
+    source are skipped, but the lowest rung is always produced.
+
+    Returns:
+        str: Path of the master playlist.
+    """
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Read the source dimensions from the ffmpeg stream metadata
+    reader = imageio_ffmpeg.read_frames(source_path)
+    source_width, source_height = next(reader)["size"]
+    reader.close()
+
+    rungs = [rung for rung in ladder if rung[0] <= source_height] or ladder[:1]
+    variants = []
+    for height, video_kbps, audio_kbps in rungs:
+        name = f"{height}p"
+        subprocess.run(
+            [
+                ffmpeg, "-y", "-loglevel", "error", "-i", source_path,
+                "-vf", f"scale=-2:{height}",
+                "-c:v", "libx264", "-preset", "veryfast",
+                "-b:v", f"{video_kbps}k",
+                "-maxrate", f"{int(video_kbps * 1.07)}k",
+                "-bufsize", f"{int(video_kbps * 1.5)}k",
+                # Fixed GOP so segment boundaries line up across renditions
+                "-g", "48", "-keyint_min", "48", "-sc_threshold", "0",
+                "-c:a", "aac", "-b:a", f"{audio_kbps}k", "-ac", "2",
+                "-hls_time", str(HLS_SEGMENT_SECONDS),
+                "-hls_playlist_type", "vod",
+                "-hls_segment_filename", os.path.join(output_dir, f"{name}_%04d.ts"),
+                os.path.join(output_dir, f"{name}.m3u8"),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        width = round(source_width * height / source_height / 2) * 2
+        variants.append((name, width, height, (video_kbps + audio_kbps) * 1000))
+
+    master_path = os.path.join(output_dir, "master.m3u8")
+    with open(master_path, "w") as master:
+        master.write("#EXTM3U\n#EXT-X-VERSION:3\n")
+        for name, width, height, bandwidth in variants:
+            master.write(
+                f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height}\n"
+                f"{name}.m3u8\n"
+            )
+    return master_path
+
+
+class RenditionPipeline:
+    """
+    Bounded process pool that builds HLS renditions after an upload.
+
+    Transcoding is CPU bound, so it runs in separate processes and never
+    blocks request handling. Every job writes to its own directory, so a job
+    for a newer upload never mixes its files with one still running for the
+    old file. The outcome is written back to ``Video.hls_status`` /
+    ``Video.hls_playlist`` when a job finishes; the directory it supersedes,
+    or its own if the video changed meanwhile, is removed.
+    """
+
+    def __init__(self, max_workers, output_root, ladder, session_factory=SessionLocal):
+        self.max_workers = max_workers
+        self.output_root = output_root
+        self.ladder = ladder
+        self.session_factory = session_factory
+        self._lock = threading.Lock()  # guards _executor
+        self._executor = None
+
+    def job_dir(self):
+        # Sharded like uploads, so rendition directories never pile up in one place
+        return os.path.join(self.output_root, content_key())
+
+    def _get_executor(self):
+        # Requests submit from threadpool threads, so only one of them may create the pool
+        with self._lock:
+            if self._executor is None:
+                # Spawn rather than fork: the process already runs the coalescer,
+                # tiering, purge and threadpool threads, whose locks a fork would copy
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def submit(self, video_id, source_path):
+        output_dir = self.job_dir()
+        future = self._get_executor().submit(
+            transcode_hls, source_path, output_dir, self.ladder
+        )
+        future.add_done_callback(partial(self._on_done, video_id, source_path, output_dir))
+        return future
+
+    def resume_pending(self):
+        """
+        Resubmit the videos still pending, e.g. after a restart.
+
+        Jobs do not survive the process: queued and running ones are cancelled
+        on shutdown and leave their videos pending.
+
+        Returns:
+            int: Number of jobs submitted.
+        """
+        db = self.session_factory()
+        try:
+            pending = (
+                db.query(Video.id, Video.video_file)
+                .filter(Video.hls_status == HLS_PENDING)
+                .order_by(Video.id)
+                .all()
+            )
+        finally:
+            db.close()
+
+        for video_id, video_file in pending:
+            # ffmpeg reads the hot path, so bring a cold file back first
+            key = storage.key(video_file) if video_file else None
+            if key is not None and storage.stat(key) is not None:
+                storage.local_path(key)
+            self.submit(video_id, video_file)
+        if pending:
+            logger.info("Resubmitted %d pending HLS jobs", len(pending))
+        return len(pending)
+
+    def _on_done(self, video_id, source_path, output_dir, future):
+        if future.cancelled():
+            # Cancelled on shutdown; the video stays pending until resume_pending
+            shutil.rmtree(output_dir, ignore_errors=True)
+            return
+        try:
+            playlist, hls_status = future.result(), HLS_READY
+        except Exception:
+            logger.exception("HLS transcoding failed for video %s", video_id)
+            playlist, hls_status = None, HLS_FAILED
+
+        # This job's directory goes unless its renditions are stored below
+        stale = {output_dir}
+        db = self.session_factory()
+        try:
+            # Skip the update if the video was replaced by a newer upload meanwhile
+            video = (
+                db.query(Video)
+                .filter(Video.id == video_id, Video.video_file == source_path)
+                .with_for_update()
+                .first()
+            )
+            if video is not None:
+                apply_stats_delta(db, **status_delta(video.hls_status, hls_status))
+                if video.hls_playlist:
+                    stale.add(os.path.dirname(video.hls_playlist))
+                if playlist is not None:
+                    stale.discard(output_dir)
+                video.hls_status = hls_status
+                video.hls_playlist = playlist
+                record_change(db, video_id, "update")
+            db.commit()
+        finally:
+            db.close()
+
+        # Remove the renditions nobody refers to anymore, once the row is updated
+        for directory in stale:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+rendition_pipeline = RenditionPipeline(
+    HLS_WORKERS, HLS_CONTENT_PATH, parse_ladder(HLS_LADDER)
+)
@@ -1,17 +1,39 @@
-import os
+import mimetypes
 import uuid
 from math import ceil
 
 from fastapi import status
+from fastapi.responses import StreamingResponse
 from moviepy.editor import VideoFileClip
+from sqlalchemy import func
 from starlette.config import Config
 
-from src.api.model import Video
-from src.api.validators import FromValidator
+from src.api.changes import record_change
+from src.api.coalescer import WRITE_COALESCING, write_coalescer
+from src.api.model import ArchivedVideo, Video, VideoChange
+from src.api.renditions import (
+    HLS_ENABLED,
+    HLS_PENDING,
+    HLS_READY,
+    remove_renditions,
+    rendition_pipeline,
+)
+from src.api.stats import apply_stats_delta, read_stats, status_delta
+from src.api.storage import content_key, storage
+from src.api.validators import FromValidator, IdListValidator, ListFilterValidator
 
 config = Config(".env")
 MEDIA_HOST = config("MEDIA_HOST")
-VIDEO_CONTENT_PATH = config("VIDEO_CONTENT_PATH")
+DETAIL_BATCH_MAX_IDS = config("DETAIL_BATCH_MAX_IDS", cast=int, default=100)
+DETAIL_CACHE_MAX_AGE = config("DETAIL_CACHE_MAX_AGE", cast=int, default=0)
+
+# Columns the list endpoint may sort by; each one has a composite (column, id) index
+SORT_FIELDS = {
+    "id": Video.id,
+    "created_at": Video.created_at,
+    "updated_at": Video.updated_at,
+    "duration": Video.duration,
+}
 
 
 class VideoCatalogService:
@@ -20,6 +42,53 @@ class VideoCatalogService:
         self.response = response
         self.db = db
 
+    def _record_change(self, video_id, operation):
+        # Append to the change feed in the same transaction, as its last write
+        record_change(self.db, video_id, operation)
+
+    @staticmethod
+    def _copy_columns(source, model):
+        # Copy the video columns between videos and the archive (which adds deleted_at)
+        return model(
+            **{column.name: getattr(source, column.name) for column in Video.__table__.columns}
+        )
+
+    @staticmethod
+    def _storage_key(video_file):
+        # Video.video_file holds the hot-tier path; old rows may point outside of it
+        return storage.key(video_file) if video_file else None
+
+    def _delete_unreferenced(self, video_file):
+        # Files of the old flat layout may be shared by videos uploaded under the same name
+        key = self._storage_key(video_file)
+        if key is None:
+            return
+        for model in (Video, ArchivedVideo):
+            if self.db.query(model.id).filter(model.video_file == video_file).first():
+                return
+        storage.delete(key)
+
+    @staticmethod
+    def _store_video(key, video_contents):
+        # Save the video file through the storage backend
+        video_path = storage.put(key, video_contents)
+        try:
+            # Calculate video duration using VideoFileClip
+            clip = VideoFileClip(storage.local_path(key))
+            duration = int(clip.duration)
+            clip.close()
+        except Exception as e:
+            duration = 0  # Set default duration if an error occurs
+        return video_path, duration
+
+    @staticmethod
+    def _with_playlist_url(video):
+        # Expose the HLS master playlist URL once the renditions are ready
+        video.hls_playlist_url = None
+        if video.hls_status == HLS_READY and video.hls_playlist:
+            video.hls_playlist_url = MEDIA_HOST + video.hls_playlist
+        return video
+
     def create_new_video(self, video_form, video_contents):
         try:
             # Validate the form data
@@ -33,38 +102,44 @@ class VideoCatalogService:
                 }
 
             if result:
-                # Get video title and path
+                # Get video title and save the video file
                 title = video_form.get("title")
-                video_path = video_form.get("video").filename
-                video_path = os.path.join(VIDEO_CONTENT_PATH, video_path)
+                video_path, duration = self._store_video(
+                    content_key(video_form.get("video").filename), video_contents
+                )
 
-                # Check if video file exists
-                if not os.path.exists(video_path):
-                    duration = 0  # Set default duration if video file doesn't exist
+                # Create and save video object
+                values = {
+                    "title": title,
+                    "video_file": video_path,
+                    "description": video_form.get("description"),
+                    "duration": duration,
+                    "hls_status": HLS_PENDING if HLS_ENABLED else None,
+                }
+                if WRITE_COALESCING:
+                    # Stored with concurrent uploads in one group-committed batch
+                    organizer = Video(**write_coalescer.insert(values))
                 else:
-                    # Save video file
-                    with open(video_path, "wb") as vid:
-                        vid.write(video_contents)
-                    try:
-                        # Calculate video duration using VideoFileClip
-                        clip = VideoFileClip(video_path)
-                        duration = int(clip.duration)
-                        clip.close()
-                    except Exception as e:
-                        duration = 0  # Set default duration if an error occurs
+                    organizer = Video(**values)
+                    self.db.add(organizer)
+                    self.db.flush()
+                    apply_stats_delta(
+                        self.db,
+                        total_videos=1,
+                        total_duration=duration,
+                        **status_delta(None, organizer.hls_status),
+                    )
+                    self._record_change(organizer.id, "create")
+                    self.db.commit()
+                    self.db.refresh(organizer)
+                    self.db.expunge(organizer)
 
-                # Create and save video object
-                organizer = Video(
-                    title=title,
-                    video_file=video_path,
-                    description=video_form.get("description"),
-                    duration=duration,
-                )
-                self.db.add(organizer)
-                self.db.commit()
-                self.db.refresh(organizer)
+                # Build HLS renditions in the background for the stored upload
+                if HLS_ENABLED:
+                    rendition_pipeline.submit(organizer.id, organizer.video_file)
+                self._with_playlist_url(organizer)
 
-                # Update video file path with media host
+                # Update video file path with media host (detached, so it is never persisted)
                 organizer.video_file = MEDIA_HOST + organizer.video_file
 
                 return {
@@ -88,16 +163,57 @@ class VideoCatalogService:
                 "error": str(e),
             }
 
-    def video_list(self, limit, offset):
+    def video_list(self, limit, offset, filters=None, sort_by="id", order="asc"):
         try:
-            # Get the total count of videos
-            total_videos = self.db.query(Video).count()
+            filters = filters or {}
+
+            # Validate the filter ranges
+            result, message = ListFilterValidator.list_filter_validator(filters)
+            if not result:
+                return {
+                    "data": None,
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": message,
+                    "error": None,
+                }
+
+            # Apply the duration and time window filters
+            query = self.db.query(Video)
+            if filters.get("min_duration") is not None:
+                query = query.filter(Video.duration >= filters["min_duration"])
+            if filters.get("max_duration") is not None:
+                query = query.filter(Video.duration <= filters["max_duration"])
+            if filters.get("created_after") is not None:
+                query = query.filter(Video.created_at >= filters["created_after"])
+            if filters.get("created_before") is not None:
+                query = query.filter(Video.created_at < filters["created_before"])
+            if filters.get("updated_after") is not None:
+                query = query.filter(Video.updated_at >= filters["updated_after"])
+            if filters.get("updated_before") is not None:
+                query = query.filter(Video.updated_at < filters["updated_before"])
+
+            # Unfiltered lists take the total from the catalog stats instead of a COUNT(*)
+            if any(value is not None for value in filters.values()):
+                total_videos = query.count()
+            else:
+                total_videos = read_stats(self.db)["total_videos"]
 
             # Calculate the total number of pages
             total_pages = ceil(total_videos / limit)
 
+            # Sort by the requested column with id as tie-breaker so pages are stable
+            sort_columns = [SORT_FIELDS[sort_by]]
+            if sort_by != "id":
+                sort_columns.append(Video.id)
+            if order == "desc":
+                query = query.order_by(*[column.desc() for column in sort_columns])
+            else:
+                query = query.order_by(*[column.asc() for column in sort_columns])
+
             # Query the videos with pagination
-            videos = self.db.query(Video).limit(limit).offset(offset).all()
+            videos = query.limit(limit).offset(offset).all()
+            for video in videos:
+                self._with_playlist_url(video)
 
             return {
                 "data": videos,
@@ -130,7 +246,7 @@ class VideoCatalogService:
             else:
                 # Return success response with the video object
                 return {
-                    "data": obj,
+                    "data": self._with_playlist_url(obj),
                     "status_code": status.HTTP_200_OK,
                     "message": "success",
                     "error": None,
@@ -144,6 +260,137 @@ class VideoCatalogService:
                 "error": str(e),
             }
 
+    def video_detail_batch(self, ids):
+        try:
+            # Validate the comma separated id list
+            result, message = IdListValidator.id_list_validator(
+                ids, DETAIL_BATCH_MAX_IDS
+            )
+            if not result:
+                return {
+                    "data": None,
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": message,
+                    "error": None,
+                }
+
+            # Keep the requested order, dropping duplicates
+            requested_ids = list(
+                dict.fromkeys(int(value) for value in ids.split(",") if value.strip())
+            )
+
+            # Resolve every id with a single IN query
+            videos = self.db.query(Video).filter(Video.id.in_(requested_ids)).all()
+            found = {video.id: self._with_playlist_url(video) for video in videos}
+
+            return {
+                "data": [found[id] for id in requested_ids if id in found],
+                "not_found": [id for id in requested_ids if id not in found],
+                "status_code": status.HTTP_200_OK,
+                "message": "success",
+                "error": None,
+            }
+        except Exception as e:
+            # Return error response if an exception occurs
+            return {
+                "data": None,
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "failed",
+                "error": str(e),
+            }
+
+    def video_changes(self, since, limit):
+        try:
+            # Writers commit in seq order, so no lower seq can appear after this read
+            changes = (
+                self.db.query(VideoChange)
+                .filter(VideoChange.seq > since)
+                .order_by(VideoChange.seq)
+                .limit(limit + 1)
+                .all()
+            )
+
+            has_more = len(changes) > limit
+            changes = changes[:limit]
+
+            # Attach the current state of the changed videos with a single IN query
+            video_ids = {change.video_id for change in changes}
+            videos = {
+                video.id: self._with_playlist_url(video)
+                for video in self.db.query(Video).filter(Video.id.in_(video_ids)).all()
+            }
+
+            return {
+                "data": [
+                    {
+                        "seq": change.seq,
+                        "video_id": change.video_id,
+                        "operation": change.operation,
+                        "changed_at": change.changed_at,
+                        "video": videos.get(change.video_id),
+                    }
+                    for change in changes
+                ],
+                "next_cursor": changes[-1].seq if changes else since,
+                "has_more": has_more,
+                "status_code": status.HTTP_200_OK,
+                "message": "success",
+                "error": None,
+            }
+        except Exception as e:
+            # Return error response if an exception occurs
+            return {
+                "data": None,
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "failed",
+                "error": str(e),
+            }
+
+    def catalog_stats(self):
+        try:
+            # Read the incrementally maintained totals instead of scanning videos
+            return {
+                "data": read_stats(self.db),
+                "status_code": status.HTTP_200_OK,
+                "message": "success",
+                "error": None,
+            }
+        except Exception as e:
+            # Return error response if an exception occurs
+            return {
+                "data": None,
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "failed",
+                "error": str(e),
+            }
+
+    def video_stream(self, id):
+        try:
+            # Query the video object by id
+            obj = self.db.query(Video).filter(Video.id == id).first()
+            key = self._storage_key(obj.video_file) if obj else None
+            if key is None or storage.stat(key) is None:
+                # Return error response if the video or its file is not found (or
+                # lies outside the content directory)
+                return {
+                    "data": None,
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": "obj not found",
+                    "error": None,
+                }
+
+            # Stream the file through the storage backend (promotes cold files)
+            media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+            return StreamingResponse(storage.stream(key), media_type=media_type)
+        except Exception as e:
+            # Return error response if an exception occurs
+            return {
+                "data": None,
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "failed",
+                "error": str(e),
+            }
+
     def delete_video(self, id):
         try:
             # Query the video object by id
@@ -157,8 +404,16 @@ class VideoCatalogService:
                     "error": None,
                 }
 
-            # Delete the video object from the database
+            # Move the video to the archive in the same transaction, keeping videos live-only
+            self.db.add(self._copy_columns(obj, ArchivedVideo))
             self.db.delete(obj)
+            apply_stats_delta(
+                self.db,
+                total_videos=-1,
+                total_duration=-(obj.duration or 0),
+                **status_delta(obj.hls_status, None),
+            )
+            self._record_change(obj.id, "delete")
             self.db.commit()
 
             # Return success response with the deleted video object
@@ -177,6 +432,56 @@ class VideoCatalogService:
                 "error": str(e),
             }
 
+    def restore_video(self, id):
+        try:
+            # Lock the archived video so a concurrent purge skips it
+            archived = (
+                self.db.query(ArchivedVideo).filter_by(id=id).with_for_update().first()
+            )
+            if not archived:
+                # Return error response if the video is not in the archive
+                return {
+                    "data": None,
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": "obj not found",
+                    "error": None,
+                }
+
+            # Move the video back under its original id in one transaction
+            obj = self._copy_columns(archived, Video)
+            obj.updated_at = func.statement_timestamp()
+            self.db.add(obj)
+            self.db.delete(archived)
+            apply_stats_delta(
+                self.db,
+                total_videos=1,
+                total_duration=obj.duration or 0,
+                **status_delta(None, obj.hls_status),
+            )
+            self._record_change(obj.id, "create")
+            self.db.commit()
+            self.db.refresh(obj)
+
+            # A rendition job that finished while the video was archived was dropped
+            if HLS_ENABLED and obj.hls_status == HLS_PENDING:
+                rendition_pipeline.submit(obj.id, obj.video_file)
+
+            # Return success response with the restored video object
+            return {
+                "data": self._with_playlist_url(obj),
+                "status_code": status.HTTP_200_OK,
+                "message": "success",
+                "error": None,
+            }
+        except Exception as e:
+            # Return error response if an exception occurs
+            return {
+                "data": None,
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "failed",
+                "error": str(e),
+            }
+
     def edit_video(self, id, video_form, video_contents):
         try:
             # Query the video object by id
@@ -190,25 +495,29 @@ class VideoCatalogService:
                     "error": None,
                 }
 
+            replaced_file, replaced_playlist = obj.video_file, obj.hls_playlist
             if video_contents:
                 file_path = video_form["video"].filename
-                video_path = os.path.join(VIDEO_CONTENT_PATH, file_path)
 
                 if video_form["video"]:
-                    # Save the new video file
-                    with open(video_path, "wb") as vid:
-                        vid.write(video_contents)
-                    try:
-                        # Calculate the new video duration using VideoFileClip
-                        clip = VideoFileClip(video_path)
-                        duration = int(clip.duration)
-                        clip.close()
-                    except Exception as e:
-                        duration = 0  # Set default duration if an error occurs
+                    # Save the new video file and calculate its duration
+                    video_path, duration = self._store_video(
+                        content_key(file_path), video_contents
+                    )
+                    old_duration, old_hls_status = obj.duration or 0, obj.hls_status
 
                     # Update video_path and duration if video file is provided
                     obj.video_file = video_path
                     obj.duration = duration
+
+                    # Old renditions no longer match the new file
+                    obj.hls_playlist = None
+                    obj.hls_status = HLS_PENDING if HLS_ENABLED else None
+                    apply_stats_delta(
+                        self.db,
+                        total_duration=duration - old_duration,
+                        **status_delta(old_hls_status, obj.hls_status),
+                    )
                 else:
                     # No new video file provided, retain the existing video file and duration
                     video_path = obj.video_file
@@ -220,12 +529,22 @@ class VideoCatalogService:
             if video_form.get("description"):
                 obj.description = video_form.get("description")
 
+            self._record_change(obj.id, "update")
             self.db.commit()
             self.db.refresh(obj)
 
+            if video_contents and obj.hls_status == HLS_PENDING:
+                rendition_pipeline.submit(obj.id, obj.video_file)
+
+            # Every upload gets a new file, so remove the one it replaced
+            if replaced_file != obj.video_file:
+                self._delete_unreferenced(replaced_file)
+            if replaced_playlist != obj.hls_playlist:
+                remove_renditions(replaced_playlist)
+
             # Return success response with the updated video object
             return {
-                "data": obj,
+                "data": self._with_playlist_url(obj),
                 "status_code": status.HTTP_200_OK,
                 "message": "success",
                 "error": None,
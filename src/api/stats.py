@@ -0,0 +1,66 @@
+import random
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from starlette.config import Config
+
+from src.api.model import CatalogStats
+
+config = Config(".env")
+STATS_SLOTS = config("STATS_SLOTS", cast=int, default=8)
+
+# CatalogStats column counting the videos in each HLS status
+HLS_STATUS_COLUMNS = {
+    "pending": "hls_pending",
+    "ready": "hls_ready",
+    "failed": "hls_failed",
+}
+
+
+def status_delta(old_status, new_status):
+    """Counter changes for a video moving from one HLS status to another."""
+    deltas = {}
+    if old_status in HLS_STATUS_COLUMNS:
+        deltas[HLS_STATUS_COLUMNS[old_status]] = -1
+    if new_status in HLS_STATUS_COLUMNS:
+        column = HLS_STATUS_COLUMNS[new_status]
+        deltas[column] = deltas.get(column, 0) + 1
+    return deltas
+
+
+def apply_stats_delta(db, **deltas):
+    """
+    Add the given deltas to the catalog totals inside the caller's transaction.
+
+    Each call upserts one randomly chosen slot row, so concurrent transactions
+    spread their row locks over STATS_SLOTS rows.
+    """
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    stmt = insert(CatalogStats).values(slot=random.randrange(STATS_SLOTS), **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["slot"],
+        set_={
+            column: getattr(CatalogStats, column) + getattr(stmt.excluded, column)
+            for column in deltas
+        },
+    )
+    db.execute(stmt)
+
+
+def read_stats(db):
+    """Catalog totals, summed over the slot rows."""
+    totals = db.query(
+        func.coalesce(func.sum(CatalogStats.total_videos), 0),
+        func.coalesce(func.sum(CatalogStats.total_duration), 0),
+        func.coalesce(func.sum(CatalogStats.hls_pending), 0),
+        func.coalesce(func.sum(CatalogStats.hls_ready), 0),
+        func.coalesce(func.sum(CatalogStats.hls_failed), 0),
+    ).one()
+    total_videos, total_duration, pending, ready, failed = (int(value) for value in totals)
+    return {
+        "total_videos": total_videos,
+        "total_duration": total_duration,
+        "by_hls_status": {"pending": pending, "ready": ready, "failed": failed},
+    }
@@ -0,0 +1,295 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
+
+logger = logging.getLogger(__name__)
+
+config = Config(".env")
+VIDEO_CONTENT_PATH = config("VIDEO_CONTENT_PATH")
+STORAGE_BACKEND = config("STORAGE_BACKEND", default="local")  # "local" or "tiered"
+COLD_CONTENT_PATH = config("COLD_CONTENT_PATH", default=None)
+# Seconds without access after which a hot file is moved to the cold tier
+STORAGE_COLD_AFTER = config("STORAGE_COLD_AFTER", cast=int, default=7 * 86400)
+STORAGE_MIGRATE_INTERVAL = config("STORAGE_MIGRATE_INTERVAL", cast=int, default=3600)
+# Top-level directories of the hot tier that are never moved (e.g. HLS renditions)
+STORAGE_COLD_EXCLUDE = config(
+    "STORAGE_COLD_EXCLUDE", cast=CommaSeparatedStrings, default="hls"
+)
+STORAGE_CHUNK_SIZE = 1024 * 1024
+
+# Content keys are "ab/cd/<32 hex chars><ext>": two levels of 256-way fan-out
+CONTENT_KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{32}(\.[a-z0-9]{1,10})?$")
+EXTENSION_PATTERN = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+def content_key(filename=None):
+    """
+    Server-assigned storage key for new content.
+
+    The name is random, so uploads never collide and are spread evenly over
+    the fan-out directories. Only a plain extension of the client filename is
+    kept (for content types and media tools); the rest of it is ignored.
+    """
+    name = uuid.uuid4().hex
+    extension = os.path.splitext(os.path.basename(filename or ""))[1].lower()
+    if not EXTENSION_PATTERN.match(extension):
+        extension = ""
+    return f"{name[:2]}/{name[2:4]}/{name}{extension}"
+
+
+def is_content_key(key):
+    """Whether a key already follows the sharded content layout."""
+    return CONTENT_KEY_PATTERN.match(key) is not None
+
+
+def _link_or_copy(source_path, target_path):
+    # A hard link is instant and needs no extra space; copy across file systems
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    tmp_path = f"{target_path}.tmp"
+    try:
+        os.link(source_path, tmp_path)
+    except OSError:
+        shutil.copy2(source_path, tmp_path)
+    os.replace(tmp_path, target_path)
+
+
+class LocalStorage:
+    """Stores media as files under a single root directory, addressed by key."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def key(self, path):
+        """Storage key of a path under the root, or None if the path is outside it."""
+        key = os.path.relpath(path, self.root)
+        if key == os.pardir or key.startswith(os.pardir + os.sep):
+            return None
+        return key
+
+    def local_path(self, key):
+        """Path of a readable local copy, for tools such as moviepy and ffmpeg."""
+        return self.path(key)
+
+    def put(self, key, data):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write next to the target and rename, so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def get(self, key):
+        with open(self.path(key), "rb") as file:
+            return file.read()
+
+    def stat(self, key):
+        try:
+            result = os.stat(self.path(key))
+        except FileNotFoundError:
+            return None
+        return {
+            "size": result.st_size,
+            "modified_at": result.st_mtime,
+            "accessed_at": result.st_atime,
+        }
+
+    def copy(self, key, new_key):
+        """Make the content of ``key`` also available as ``new_key``."""
+        _link_or_copy(self.path(key), self.path(new_key))
+        return self.path(new_key)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def stream(self, key, chunk_size=STORAGE_CHUNK_SIZE):
+        with open(self.path(key), "rb") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class TieredStorage:
+    """
+    Hot/cold storage over two local directories (typically different volumes).
+
+    New files go to the hot tier and every access records the file's access
+    time. A background thread moves files that were not accessed for
+    ``cold_after`` seconds to the cold tier; accessing a cold file moves it
+    back to the hot tier first. Moves hold a lock for their key only, so
+    copying one large file between tiers never stalls access to other keys.
+    """
+
+    def __init__(self, hot_root, cold_root, cold_after, interval, exclude=()):
+        self.hot = LocalStorage(hot_root)
+        self.cold = LocalStorage(cold_root)
+        self.cold_after = cold_after
+        self.interval = interval
+        self.exclude = tuple(exclude)
+        self._lock = threading.Lock()  # guards _key_locks
+        self._key_locks = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def path(self, key):
+        return self.hot.path(key)
+
+    @contextmanager
+    def _locked(self, key):
+        # One lock per key, dropped again once nobody holds or waits for it
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def key(self, path):
+        return self.hot.key(path)
+
+    def _move(self, source, target, key):
+        target_path = target.path(key)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp_path = f"{target_path}.tmp"
+        shutil.copy2(source.path(key), tmp_path)
+        os.replace(tmp_path, target_path)
+        os.remove(source.path(key))
+
+    def _touch(self, key):
+        path = self.hot.path(key)
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+
+    def local_path(self, key):
+        with self._locked(key):
+            if self.hot.stat(key) is None and self.cold.stat(key) is not None:
+                # Bring the file back to the hot tier on access
+                self._move(self.cold, self.hot, key)
+            self._touch(key)
+        return self.hot.path(key)
+
+    def put(self, key, data):
+        with self._locked(key):
+            path = self.hot.put(key, data)
+            # A replaced file must not leave a stale copy in the cold tier
+            self.cold.delete(key)
+        return path
+
+    def get(self, key):
+        self.local_path(key)
+        return self.hot.get(key)
+
+    def stat(self, key):
+        for tier, storage in (("hot", self.hot), ("cold", self.cold)):
+            result = storage.stat(key)
+            if result is not None:
+                return {**result, "tier": tier}
+        return None
+
+    def copy(self, key, new_key):
+        # Copy within the tier that holds the file, so cold files stay cold
+        with self._locked(key):
+            tier = self.hot if self.hot.stat(key) is not None else self.cold
+            tier.copy(key, new_key)
+        return self.hot.path(new_key)
+
+    def delete(self, key):
+        with self._locked(key):
+            deleted_hot = self.hot.delete(key)
+            deleted_cold = self.cold.delete(key)
+        return deleted_hot or deleted_cold
+
+    def stream(self, key, chunk_size=STORAGE_CHUNK_SIZE):
+        # A generator, so a cold file is only promoted once the response is
+        # iterated, in the threadpool rather than on the event loop
+        self.local_path(key)
+        yield from self.hot.stream(key, chunk_size)
+
+    def migrate_cold(self):
+        """
+        Move hot files not accessed for ``cold_after`` seconds to the cold tier.
+
+        Returns:
+            int: Number of files moved.
+        """
+        cutoff = time.time() - self.cold_after
+        moved = 0
+        for directory, dirnames, filenames in os.walk(self.hot.root):
+            if directory == self.hot.root:
+                dirnames[:] = [name for name in dirnames if name not in self.exclude]
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                key = os.path.relpath(os.path.join(directory, filename), self.hot.root)
+                with self._locked(key):
+                    result = self.hot.stat(key)
+                    if result is None or result["accessed_at"] >= cutoff:
+                        continue
+                    self._move(self.hot, self.cold, key)
+                moved += 1
+        return moved
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.migrate_cold()
+            except Exception:
+                logger.exception("Cold tier migration failed")
+
+    def start(self):
+        """Start the background migration thread."""
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="storage-tiering", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+
+def get_storage():
+    """Build the storage backend selected by STORAGE_BACKEND."""
+    if STORAGE_BACKEND == "tiered":
+        if not COLD_CONTENT_PATH:
+            raise ValueError("COLD_CONTENT_PATH must be set when STORAGE_BACKEND is tiered")
+        return TieredStorage(
+            VIDEO_CONTENT_PATH,
+            COLD_CONTENT_PATH,
+            STORAGE_COLD_AFTER,
+            STORAGE_MIGRATE_INTERVAL,
+            STORAGE_COLD_EXCLUDE,
+        )
+    return LocalStorage(VIDEO_CONTENT_PATH)
+
+
+storage = get_storage()
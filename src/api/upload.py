@@ -0,0 +1,89 @@
+from starlette.config import Config
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from src.api.validators import UploadValidator
+
+config = Config(".env")
+UPLOAD_MAX_BYTES = config("UPLOAD_MAX_BYTES", cast=int, default=2 * 1024**3)
+UPLOAD_SNIFF_BYTES = config("UPLOAD_SNIFF_BYTES", cast=int, default=4096)
+
+
+class UploadSniffingParser(MultiPartParser):
+    """
+    Multipart parser that validates the ``video`` part while it streams in.
+
+    The first ``UPLOAD_SNIFF_BYTES`` of the file are checked for a known video
+    container signature and the running size against ``UPLOAD_MAX_BYTES``.
+    A failed check raises ``MultiPartException`` from inside the parser
+    callbacks, before the data of that chunk is written and before the rest
+    of the body is read from the client.
+    """
+
+    field_name = "video"
+
+    def __init__(self, headers, stream):
+        super().__init__(headers, stream)
+        self._head = b""
+        self._size = 0
+        self._sniffed = False
+
+    def _is_video_part(self):
+        return (
+            self._current_part.file is not None
+            and self._current_part.field_name == self.field_name
+        )
+
+    def _sniff(self):
+        self._sniffed = True
+        result, message = UploadValidator.content_validator(self._head)
+        if not result:
+            raise MultiPartException(message)
+
+    def on_part_data(self, data, start, end):
+        if self._is_video_part():
+            self._size += end - start
+            result, message = UploadValidator.size_validator(
+                self._size, UPLOAD_MAX_BYTES
+            )
+            if not result:
+                raise MultiPartException(message)
+            if not self._sniffed:
+                self._head += data[start:end]
+                if len(self._head) >= UPLOAD_SNIFF_BYTES:
+                    self._sniff()
+        super().on_part_data(data, start, end)
+
+    def on_part_end(self):
+        # Files shorter than the sniff window are checked once they end
+        if self._is_video_part() and not self._sniffed and self._head:
+            self._sniff()
+        super().on_part_end()
+
+
+async def read_upload_form(request):
+    """
+    Read the request form, rejecting a bad ``video`` upload as early as possible.
+
+    The declared Content-Length is checked before any of the body is read and
+    the file itself is checked by ``UploadSniffingParser`` while it streams in.
+
+    Returns:
+        tuple: ``(form, None)`` on success or ``(None, message)`` if rejected.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        result, message = UploadValidator.size_validator(
+            int(content_length), UPLOAD_MAX_BYTES
+        )
+        if not result:
+            return None, message
+
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        return await request.form(), None
+
+    try:
+        form = await UploadSniffingParser(request.headers, request.stream()).parse()
+    except MultiPartException as exc:
+        return None, exc.message
+    return form, None
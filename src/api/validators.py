@@ -9,3 +9,76 @@ class FromValidator:
         if payload["description"] == "":
             result, message = False, "Video Description is required"
         return result, message
+
+
+class ListFilterValidator:
+    @staticmethod
+    def list_filter_validator(filters):
+        result, message = True, "failed"
+        ranges = (
+            ("min_duration", "max_duration", "Duration"),
+            ("created_after", "created_before", "Created"),
+            ("updated_after", "updated_before", "Updated"),
+        )
+        for low, high, label in ranges:
+            if (
+                filters.get(low) is not None
+                and filters.get(high) is not None
+                and filters[low] > filters[high]
+            ):
+                result, message = False, f"{label} range is invalid"
+        return result, message
+
+
+class UploadValidator:
+    # (offset, signature) pairs of the video containers we accept
+    SIGNATURES = (
+        (4, b"ftyp"),  # MP4 / MOV / M4V / 3GP (ISO base media)
+        (4, b"moov"),  # QuickTime without an ftyp box
+        (4, b"mdat"),
+        (4, b"wide"),
+        (0, b"\x1a\x45\xdf\xa3"),  # Matroska / WebM
+        (0, b"FLV\x01"),
+        (0, b"OggS"),
+        (0, b"\x00\x00\x01\xba"),  # MPEG program stream
+        (0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11"),  # ASF / WMV
+    )
+    # Consecutive MPEG-TS packets whose sync byte must be present
+    TS_SYNC_PACKETS = 3
+
+    @staticmethod
+    def size_validator(size, max_size):
+        result, message = True, "failed"
+        if size > max_size:
+            result, message = False, "Video Content is too large"
+        return result, message
+
+    @staticmethod
+    def content_validator(head):
+        result, message = False, "Video Content type is not supported"
+        if any(head[offset:offset + len(sig)] == sig for offset, sig in UploadValidator.SIGNATURES):
+            result = True
+        # AVI is a RIFF container with an "AVI " form type
+        if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+            result = True
+        # MPEG transport stream packets are 188 bytes long and start with 0x47;
+        # a single 0x47 ("G") is too common, so require it on several packets
+        ts_packets = range(0, UploadValidator.TS_SYNC_PACKETS * 188, 188)
+        if len(head) >= len(ts_packets) * 188 and all(head[i] == 0x47 for i in ts_packets):
+            result = True
+        return result, message
+
+
+class IdListValidator:
+    @staticmethod
+    def id_list_validator(ids, max_ids):
+        result, message = True, "failed"
+        values = [value.strip() for value in ids.split(",") if value.strip()]
+        if not values:
+            result, message = False, "Video IDs are required"
+        # isdigit() also accepts characters such as superscripts that int() rejects
+        elif not all(value.isdecimal() for value in values):
+            result, message = False, "Video IDs must be comma separated integers"
+        elif len(values) > max_ids:
+            result, message = False, f"At most {max_ids} video IDs are allowed"
+        return result, message
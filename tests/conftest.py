@@ -7,7 +7,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from database import Base, SessionLocal, engine, get_db
-from routers import video_catalog
+from routers import monitoring, video_catalog
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # this is to include backend dir in sys.path so that we can import from db,main.py
@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 def start_application():
     app = FastAPI()
     app.include_router(video_catalog.router)
+    app.include_router(monitoring.router)
     return app
 
 
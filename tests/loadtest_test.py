@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+
+from loadtest import LoadTest, parse_mix, percentile
+
+
+class TestLoadTest:
+    def test_01_parse_mix(self):
+        """
+        Test case for parsing the endpoint mix of the load test.
+
+        """
+        assert parse_mix("create=1, list=5,detail") == {
+            "create": 1.0,
+            "list": 5.0,
+            "detail": 1.0,
+        }
+
+    def test_02_parse_mix_unknown_endpoint(self):
+        """
+        Test case for rejecting an unknown endpoint in the mix.
+
+        """
+        with pytest.raises(ValueError):
+            parse_mix("upload=1")
+
+    def test_03_percentile(self):
+        """
+        Test case for the nearest-rank percentile used in the report.
+
+        """
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 95) == 0.0
+
+    def test_04_failed_requests_not_in_latency(self):
+        """
+        Test case for keeping failed requests out of throughput and latency.
+
+        A 503 admission rejection and an error reported in the body are counted
+        as errors only.
+
+        """
+        responses = iter(
+            [
+                httpx.Response(200, json={"status_code": 200, "data": []}),
+                httpx.Response(503, json={"detail": "Server busy"}),
+                httpx.Response(200, json={"status_code": 500, "data": None}),
+            ]
+        )
+        transport = httpx.MockTransport(lambda request: next(responses))
+        load_test = LoadTest("http://test", {"list": 1}, b"", 1, 1, 0, 0)
+
+        async def run():
+            async with httpx.AsyncClient(base_url="http://test", transport=transport) as client:
+                for _ in range(3):
+                    await load_test.call(client, "list")
+
+        asyncio.run(run())
+        report = load_test.report(elapsed=1.0)["endpoints"]["list"]
+
+        assert report["requests"] == 1
+        assert report["throughput_rps"] == 1.0
+        assert report["errors"] == {"503": 1, "500": 1}
@@ -0,0 +1,114 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from database import MeteredQueuePool, PoolMetrics, engine
+from routers import monitoring
+
+
+class TestMonitoring:
+    def test_01_pool_metrics(self, client):
+        """
+        Test case for retrieving the connection pool metrics.
+
+        """
+        response = client.get("/monitoring/pool/")
+
+        assert response.json()["status_code"] == 200
+        data = response.json()["data"]
+        assert data["pool_size"] == engine.pool.size()
+        assert data["checkouts_total"] >= 1
+        assert "checkout_wait_seconds_max" in data
+
+    def test_02_pool_metrics_count_timeouts(self, monkeypatch):
+        """
+        Test case for counting a checkout that times out waiting for a connection.
+
+        """
+        metrics = PoolMetrics()
+        monkeypatch.setattr("database.pool_metrics", metrics)
+        pool = MeteredQueuePool(MagicMock, pool_size=1, max_overflow=0, timeout=0.01)
+        metrics.listen(pool)
+
+        connection = pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        connection.close()
+
+        snapshot = metrics.snapshot(pool)
+        assert snapshot["checkout_timeouts_total"] == 1
+        assert snapshot["checkouts_total"] == 1
+        assert snapshot["connects_total"] == 1
+        assert snapshot["open_connections"] == 1
+
+    def test_03_readiness(self, client):
+        """
+        Test case for the readiness probe with a reachable database.
+
+        """
+        response = client.get("/monitoring/ready/")
+
+        assert response.status_code == 200
+        assert response.json()["message"] == "success"
+
+    def test_04_readiness_failed(self, client, monkeypatch):
+        """
+        Test case for the readiness probe when no connection can be handed out.
+
+        """
+
+        def _fail():
+            raise exc.TimeoutError("QueuePool limit reached")
+
+        monkeypatch.setattr(monitoring, "_check_connection", _fail)
+
+        response = client.get("/monitoring/ready/")
+
+        assert response.status_code == 503
+        assert response.json()["message"] == "failed"
+
+    def test_05_pool_wait_excludes_connect_and_retries(self, monkeypatch):
+        """
+        Test case for timing one checkout that opens a connection after a lost race.
+
+        The retry records a single wait, and opening the connection is counted
+        as connect time rather than waiting.
+
+        """
+        metrics = PoolMetrics()
+        monkeypatch.setattr("database.pool_metrics", metrics)
+        waits = []
+        record_wait = metrics.record_wait
+
+        def recording_wait(seconds, timed_out):
+            waits.append(seconds)
+            record_wait(seconds, timed_out)
+
+        monkeypatch.setattr(metrics, "record_wait", recording_wait)
+
+        # Lose one overflow race, so QueuePool retries its get recursively
+        do_get = QueuePool._do_get
+        races = []
+
+        def racing_do_get(pool):
+            if not races:
+                races.append(True)
+                return pool._do_get()
+            return do_get(pool)
+
+        monkeypatch.setattr(QueuePool, "_do_get", racing_do_get)
+
+        def slow_connect():
+            time.sleep(0.05)
+            return MagicMock()
+
+        pool = MeteredQueuePool(slow_connect, pool_size=1, max_overflow=0)
+        pool.connect().close()
+
+        snapshot = metrics.snapshot(pool)
+        assert len(waits) == 1
+        assert waits[0] < 0.05
+        assert snapshot["connect_seconds_max"] >= 0.05
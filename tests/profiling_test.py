@@ -0,0 +1,55 @@
+import json
+import tracemalloc
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.profiling import MemoryProfiler
+
+
+class TestMemoryProfiling:
+    def test_01_profiles_selected_routes(self, tmp_path):
+        """
+        Test case for recording the peak allocation of a profiled route.
+
+        A route allocating and freeing 5 MB must report a peak of at least that
+        size, while an unprofiled route must not be recorded. Tracing stops
+        again once the profiled request is done.
+
+        """
+        report_path = tmp_path / "memory.jsonl"
+        profiler = MemoryProfiler(["/upload/"], 5, 1, 10, str(report_path))
+        app = FastAPI()
+        app.middleware("http")(profiler.middleware)
+
+        @app.post("/upload/")
+        async def upload():
+            payload = bytearray(5 * 1024 * 1024)
+            return {"size": len(payload)}
+
+        @app.get("/other/")
+        async def other():
+            return {}
+
+        with TestClient(app) as client:
+            client.post("/upload/")
+            assert not tracemalloc.is_tracing()
+            client.get("/other/")
+
+        assert len(profiler.records) == 1
+        record = profiler.records[0]
+        assert record["path"] == "/upload/"
+        assert record["peak_bytes"] >= 5 * 1024 * 1024
+        assert profiler.summary()["/upload/"]["requests"] == 1
+        with open(report_path) as report:
+            assert json.loads(report.readline())["path"] == "/upload/"
+
+    def test_02_memory_endpoint(self, client):
+        """
+        Test case for retrieving the memory profile debug endpoint.
+
+        """
+        response = client.get("/monitoring/memory/")
+
+        assert response.json()["status_code"] == 200
+        assert "records" in response.json()["data"]
@@ -0,0 +1,53 @@
+import os
+
+import rehome_content
+from rehome_content import rehome
+from src.api.model import Video, VideoChange
+from src.api.renditions import HLS_PENDING
+from src.api.storage import LocalStorage, is_content_key
+
+
+class TestRehomeContent:
+    def test_01_rehome_flat_files(self, db_session, tmp_path, monkeypatch):
+        """
+        Test case for moving flat-layout files to sharded content keys.
+
+        Videos sharing a filename get their own files, the old file goes away
+        once unused, and pending or already sharded videos are left alone.
+
+        """
+        storage = LocalStorage(str(tmp_path))
+        monkeypatch.setattr(rehome_content, "storage", storage)
+        monkeypatch.setattr(rehome_content, "VIDEO_CONTENT_PATH", str(tmp_path))
+
+        storage.put("clip.mp4", b"clip-bytes")
+        storage.put("pending.mp4", b"pending-bytes")
+        sharded_path = storage.put("ab/cd/" + "ab" * 16 + ".mp4", b"sharded-bytes")
+        videos = [
+            Video(title="a", video_file=storage.path("clip.mp4")),
+            Video(title="b", video_file=storage.path("clip.mp4")),
+            Video(title="c", video_file=storage.path("pending.mp4"), hls_status=HLS_PENDING),
+            Video(title="d", video_file=sharded_path),
+        ]
+        db_session.add_all(videos)
+        db_session.commit()
+
+        totals = rehome(db_session, Video, batch_size=1)
+
+        assert totals == {"moved": 2, "skipped": 1}
+        for video in videos:
+            db_session.refresh(video)
+        first, second, pending, sharded = videos
+        assert first.video_file != second.video_file
+        for video in (first, second):
+            key = os.path.relpath(video.video_file, str(tmp_path))
+            assert is_content_key(key)
+            assert storage.get(key) == b"clip-bytes"
+        assert storage.stat("clip.mp4") is None
+        assert pending.video_file == storage.path("pending.mp4")
+        assert sharded.video_file == sharded_path
+        updates = db_session.query(VideoChange).filter(
+            VideoChange.video_id.in_([first.id, second.id]),
+            VideoChange.operation == "update",
+        )
+        assert updates.count() == 2
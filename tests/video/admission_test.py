@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import uuid
+
+from src.api.admission import ConcurrencyLimiter, upload_limiter
+from src.api.sevice import VideoCatalogService
+
+
+class TestAdmissionControl:
+    def test_01_limiter_queues_then_admits(self):
+        """
+        Test case for a request waiting in the queue until a slot is released.
+
+        """
+
+        async def scenario():
+            limiter = ConcurrencyLimiter("test", 1, 1, 1.0)
+            assert await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            assert limiter.metrics()["queue_depth"] == 1
+            limiter.release()
+            assert await waiter
+            limiter.release()
+            return limiter.metrics()
+
+        metrics = asyncio.run(scenario())
+        assert metrics["admitted_total"] == 2
+        assert metrics["rejected_total"] == 0
+        assert metrics["in_flight"] == 0
+
+    def test_02_limiter_rejects_when_queue_full(self):
+        """
+        Test case for rejecting a request when both the slots and the queue are full.
+
+        """
+
+        async def scenario():
+            limiter = ConcurrencyLimiter("test", 1, 0, 1.0)
+            assert await limiter.acquire()
+            assert not await limiter.acquire()
+            return limiter.metrics()
+
+        metrics = asyncio.run(scenario())
+        assert metrics["rejected_total"] == 1
+        assert metrics["in_flight"] == 1
+
+    def test_03_limiter_rejects_after_queue_timeout(self):
+        """
+        Test case for rejecting a queued request once its wait times out.
+
+        """
+
+        async def scenario():
+            limiter = ConcurrencyLimiter("test", 1, 1, 0.01)
+            assert await limiter.acquire()
+            assert not await limiter.acquire()
+            return limiter.metrics()
+
+        metrics = asyncio.run(scenario())
+        assert metrics["rejected_total"] == 1
+        assert metrics["queue_depth"] == 0
+
+    def test_04_upload_rejected_with_retry_after(self, client, monkeypatch):
+        """
+        Test case for an upload rejected with 503 and Retry-After when no slot is free.
+
+        """
+        monkeypatch.setattr(upload_limiter, "max_concurrency", 0)
+        monkeypatch.setattr(upload_limiter, "max_queue", 0)
+
+        response = client.post("/videocatalog/create/", data={"title": "test"})
+
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+    def test_05_admission_metrics(self, client):
+        """
+        Test case for retrieving the admission control metrics.
+
+        """
+        client.get("/videocatalog/list/")
+
+        response = client.get("/monitoring/admission/")
+
+        assert response.json()["status_code"] == 200
+        names = [limiter["name"] for limiter in response.json()["data"]]
+        assert names == ["upload", "read"]
+
+    def test_06_read_served_during_upload(self, client, monkeypatch):
+        """
+        Test case for a list request answered while an upload is still being stored.
+
+        """
+        storing, release = threading.Event(), threading.Event()
+        store_video = VideoCatalogService._store_video
+
+        def slow_store_video(key, video_contents):
+            storing.set()
+            release.wait(5)
+            return store_video(key, video_contents)
+
+        monkeypatch.setattr(VideoCatalogService, "_store_video", staticmethod(slow_store_video))
+
+        video = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom" + b"\x00" * 1024
+        upload = threading.Thread(
+            target=client.post,
+            args=("/videocatalog/create/",),
+            kwargs={
+                "data": {"title": "slow upload", "description": "slow upload"},
+                "files": {"video": ("slow.mp4", video, "video/mp4")},
+            },
+        )
+        upload.start()
+        try:
+            assert storing.wait(5)
+            responses = []
+            read = threading.Thread(
+                target=lambda: responses.append(client.get("/videocatalog/list/"))
+            )
+            read.start()
+            read.join(2)
+
+            assert not read.is_alive()
+            assert responses[0].json()["status_code"] == 200
+        finally:
+            release.set()
+            upload.join()
+
+    def test_07_idempotent_replay_without_upload_slot(self, client, monkeypatch):
+        """
+        Test case for replaying a completed Idempotency-Key while no upload slot is free.
+
+        """
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        video = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom" + b"\x00" * 1024
+        request = {
+            "data": {"title": "replayed upload", "description": "replayed upload"},
+            "files": {"video": ("replayed.mp4", video, "video/mp4")},
+            "headers": headers,
+        }
+        first = client.post("/videocatalog/create/", **request)
+
+        monkeypatch.setattr(upload_limiter, "max_concurrency", 0)
+        monkeypatch.setattr(upload_limiter, "max_queue", 0)
+        retry = client.post("/videocatalog/create/", **request)
+
+        assert retry.status_code == 200
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert retry.json() == first.json()
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+from src.api import archive
+from src.api.archive import ArchivePurger
+from src.api.model import ArchivedVideo, Video
+from src.api.storage import LocalStorage
+
+
+class TestArchive:
+    def test_01_purge_past_retention(self, db_session, tmp_path, monkeypatch):
+        """
+        Test case for purging archived videos in batches.
+
+        Only rows past the retention are purged, and neither a file still used
+        by a live video nor one outside the content directory is deleted.
+
+        """
+        storage = LocalStorage(str(tmp_path / "content"))
+        outside = tmp_path / "outside.mp4"
+        outside.write_bytes(b"not ours")
+        renditions = tmp_path / "hls" / "ab" / "cd" / "job"
+        renditions.mkdir(parents=True)
+        (renditions / "master.m3u8").write_text("#EXTM3U\n")
+        monkeypatch.setattr(archive, "storage", storage)
+
+        now = datetime.now(timezone.utc)
+        expired = now - timedelta(days=2)
+        for name in ("old.mp4", "shared.mp4", "recent.mp4"):
+            storage.put(name, b"video-bytes")
+        db_session.add(Video(title="live", video_file=storage.path("shared.mp4")))
+        db_session.add_all(
+            [
+                ArchivedVideo(
+                    id=900001, video_file=storage.path("old.mp4"),
+                    hls_playlist=str(renditions / "master.m3u8"),
+                    created_at=expired, updated_at=expired, deleted_at=expired,
+                ),
+                ArchivedVideo(
+                    id=900002, video_file=storage.path("shared.mp4"),
+                    created_at=expired, updated_at=expired, deleted_at=expired,
+                ),
+                ArchivedVideo(
+                    id=900004, video_file=str(outside),
+                    created_at=expired, updated_at=expired, deleted_at=expired,
+                ),
+                ArchivedVideo(
+                    id=900003, video_file=storage.path("recent.mp4"),
+                    created_at=expired, updated_at=expired, deleted_at=now,
+                ),
+            ]
+        )
+        db_session.commit()
+
+        purger = ArchivePurger(retention=86400, interval=60, batch_size=1)
+
+        assert purger.purge(db_session) == 3
+        remaining = [row.id for row in db_session.query(ArchivedVideo).filter(
+            ArchivedVideo.id.in_([900001, 900002, 900003, 900004])
+        )]
+        assert remaining == [900003]
+        assert storage.stat("old.mp4") is None
+        assert storage.stat("shared.mp4") is not None
+        assert storage.stat("recent.mp4") is not None
+        assert outside.exists()
+        assert not renditions.exists()
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from sqlalchemy import func
+
+from database import SessionLocal
+from src.api.changes import record_change
+from src.api.model import Video, VideoChange
+from src.api.sevice import VideoCatalogService
+
+
+@pytest.fixture
+def sessions(app):
+    """
+    Independent sessions that really commit, as concurrent requests would.
+
+    The rows they create are removed again after the test.
+    """
+    opened = []
+
+    def open_session():
+        session = SessionLocal()
+        opened.append(session)
+        return session
+
+    yield open_session
+
+    for session in opened:
+        session.rollback()
+        session.close()
+    with SessionLocal() as cleanup:
+        cleanup.query(VideoChange).filter(
+            VideoChange.video_id.in_(
+                cleanup.query(Video.id).filter(Video.title.like("change feed %"))
+            )
+        ).delete(synchronize_session=False)
+        cleanup.query(Video).filter(Video.title.like("change feed %")).delete(
+            synchronize_session=False
+        )
+        cleanup.commit()
+
+
+def poll(session, since):
+    # A fresh snapshot each time, like a client calling the feed again
+    session.commit()
+    return VideoCatalogService(None, None, session).video_changes(since, 100)["data"]
+
+
+class TestChangeFeed:
+    def test_01_writers_commit_in_seq_order(self, sessions):
+        """
+        Test case for two transactions writing the change feed concurrently.
+
+        The first writer takes the lower seq, so the second one must wait for it
+        to finish. A reader never sees the second change before the first, which
+        would move its cursor past a change that commits later.
+
+        """
+        first, second, reader = sessions(), sessions(), sessions()
+        cursor = reader.query(func.coalesce(func.max(VideoChange.seq), 0)).scalar()
+
+        first_video = Video(title="change feed first")
+        first.add(first_video)
+        first.flush()
+        record_change(first, first_video.id, "create")
+        first.flush()
+
+        second_done = threading.Event()
+
+        def write_second():
+            video = Video(title="change feed second")
+            second.add(video)
+            second.flush()
+            record_change(second, video.id, "create")
+            second.commit()
+            second_done.set()
+
+        writer = threading.Thread(target=write_second)
+        writer.start()
+        try:
+            # The second writer waits for the change feed lock
+            assert not second_done.wait(1)
+            assert poll(reader, cursor) == []
+        finally:
+            first.commit()
+            writer.join(10)
+        assert second_done.is_set()
+
+        changes = poll(reader, cursor)
+        assert [change["video"].title for change in changes] == [
+            "change feed first",
+            "change feed second",
+        ]
+        assert changes[0]["seq"] < changes[1]["seq"]
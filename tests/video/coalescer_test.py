@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import exc
+
+from database import SessionLocal, engine
+from src.api.coalescer import WriteCoalescer
+from src.api.model import VideoChange
+
+
+@pytest.fixture
+def connection(app):
+    """A connection whose writes are rolled back after the test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+def make_coalescer(connection, window=0.5, max_batch=3):
+    # Each batch commits a savepoint, so the outer test transaction stays open
+    return WriteCoalescer(
+        window,
+        max_batch,
+        session_factory=lambda: SessionLocal(
+            bind=connection, join_transaction_mode="create_savepoint"
+        ),
+    )
+
+
+class TestWriteCoalescer:
+    def test_01_concurrent_inserts_share_one_batch(self, connection):
+        """
+        Test case for group committing concurrent inserts.
+
+        Every caller gets its own row and the change feed has a create for each.
+
+        """
+        coalescer = make_coalescer(connection)
+        titles = ["first", "second", "third"]
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                rows = list(
+                    executor.map(
+                        lambda title: coalescer.insert({"title": title, "duration": 10}),
+                        titles,
+                    )
+                )
+        finally:
+            coalescer.stop()
+
+        assert [row["title"] for row in rows] == titles
+        assert len({row["id"] for row in rows}) == 3
+        assert all(row["created_at"] is not None for row in rows)
+        assert coalescer.metrics()["batches_total"] == 1
+        assert coalescer.metrics()["largest_batch"] == 3
+
+        db = SessionLocal(bind=connection)
+        changes = db.query(VideoChange).filter(
+            VideoChange.video_id.in_([row["id"] for row in rows])
+        )
+        assert {change.operation for change in changes} == {"create"}
+        assert changes.count() == 3
+        db.close()
+
+    def test_02_failed_row_does_not_fail_the_batch(self, connection):
+        """
+        Test case for a batch with one invalid row.
+
+        The invalid row's caller gets the error, the other caller its row.
+
+        """
+        coalescer = make_coalescer(connection, max_batch=2)
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                good = executor.submit(coalescer.insert, {"title": "good"})
+                bad = executor.submit(coalescer.insert, {"title": "x" * 101})
+
+                assert good.result()["title"] == "good"
+                with pytest.raises(exc.DataError):
+                    bad.result()
+        finally:
+            coalescer.stop()
+
+        assert coalescer.metrics()["batch_retries_total"] == 1
@@ -1,17 +1,29 @@
 import base64
 import io
+import os
+import uuid
+from datetime import datetime, timezone
 
 import pytest
 from faker import Faker
 
+from src.api import idempotency, upload
+from src.api.idempotency import IdempotencyService
+from src.api.model import Video
+
 fake = Faker()
 
 
 class TestCaseHelper:
     @staticmethod
-    def create_catalog_object(client):
+    def fake_video():
+        # An MP4 "ftyp" box followed by random payload, enough to pass the upload sniffing
+        return b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom" + fake.binary(length=1024)
+
+    @staticmethod
+    def create_catalog_object(client, headers=None):
         # Prepare the fake video data
-        fake_video_data = fake.image()  # Replace with actual video data
+        fake_video_data = TestCaseHelper.fake_video()
 
         # Convert video data to base64-encoded string
         video_base64 = base64.b64encode(fake_video_data).decode("utf-8")
@@ -31,6 +43,7 @@ class TestCaseHelper:
             "/videocatalog/create/",
             data=data,
             files={"video": ("fake_video.mp4", video_data, "video/mp4")},
+            headers=headers,
         )
         return response
 
@@ -63,7 +76,7 @@ class TestVideoCatalog:
 
         """
         # Prepare the fake video data
-        fake_video_data = fake.image()  # Replace with actual video data
+        fake_video_data = TestCaseHelper.fake_video()
 
         # Convert video data to base64-encoded string
         video_base64 = base64.b64encode(fake_video_data).decode("utf-8")
@@ -131,7 +144,7 @@ class TestVideoCatalog:
 
         """
         # Prepare the fake video data
-        fake_video_data = fake.image()  # Replace with actual video data
+        fake_video_data = TestCaseHelper.fake_video()
 
         # Convert video data to base64-encoded string
         video_base64 = base64.b64encode(fake_video_data).decode("utf-8")
@@ -269,7 +282,7 @@ class TestVideoCatalog:
             "duration": 15,
         }
 
-        fake_video_data = fake.image()
+        fake_video_data = TestCaseHelper.fake_video()
 
         # Convert video data to base64-encoded string
         video_base64 = base64.b64encode(fake_video_data).decode("utf-8")
@@ -299,7 +312,7 @@ class TestVideoCatalog:
 
         """
         # Prepare the fake video data
-        fake_video_data = fake.image()  # Replace with actual video data
+        fake_video_data = TestCaseHelper.fake_video()
 
         # Convert video data to base64-encoded string
         video_base64 = base64.b64encode(fake_video_data).decode("utf-8")
@@ -412,3 +425,346 @@ class TestVideoCatalog:
         assert response.json()["status_code"] == 200
         assert response.json()["message"] == "success"
 
+
+    def test_15_videocatalog_list_sorted_desc(self, client):
+        """
+        Test case for retrieving the list of videos sorted by id in descending order.
+
+        It creates two videos and asserts the newest one is returned first.
+
+        """
+        first = TestCaseHelper.create_catalog_object(client).json()["data"]["id"]
+        second = TestCaseHelper.create_catalog_object(client).json()["data"]["id"]
+
+        response = client.get("/videocatalog/list/?sort_by=id&order=desc")
+
+        assert response.json()["status_code"] == 200
+        ids = [video["id"] for video in response.json()["data"]]
+        assert ids.index(second) < ids.index(first)
+
+    def test_16_videocatalog_list_filter_duration(self, client):
+        """
+        Test case for filtering the list of videos by a duration range.
+
+        The fake videos have no playable content, so their duration is 0 and a
+        minimum duration of 1 second must exclude them.
+
+        """
+        TestCaseHelper.create_catalog_object(client)
+
+        response = client.get("/videocatalog/list/?min_duration=1")
+
+        assert response.json()["status_code"] == 200
+        assert response.json()["data"] == []
+        assert response.json()["total_pages"] == 0
+
+    def test_17_videocatalog_list_filter_invalid_range(self, client):
+        """
+        Test case for retrieving the list of videos with an inverted duration range.
+
+        """
+        response = client.get("/videocatalog/list/?min_duration=20&max_duration=10")
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "Duration range is invalid"
+
+    def test_18_videocatalog_list_invalid_sort(self, client):
+        """
+        Test case for retrieving the list of videos with an unknown sort column.
+
+        """
+        response = client.get("/videocatalog/list/?sort_by=title")
+
+        assert response.status_code == 422
+
+    def test_19_videocatalog_create_idempotent_retry(self, client):
+        """
+        Test case for retrying a create request with the same Idempotency-Key.
+
+        The retry must replay the stored response instead of creating a second video.
+
+        """
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+        first = TestCaseHelper.create_catalog_object(client, headers=headers)
+        retry = TestCaseHelper.create_catalog_object(client, headers=headers)
+
+        assert first.json()["status_code"] == 200
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+
+    def test_20_videocatalog_create_idempotent_in_progress(self, client, db_session, monkeypatch):
+        """
+        Test case for a retry arriving while the request owning the key is still running.
+
+        """
+        monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_TIMEOUT", 0)
+        key = str(uuid.uuid4())
+        assert IdempotencyService(db_session).claim(key)
+
+        response = TestCaseHelper.create_catalog_object(
+            client, headers={"Idempotency-Key": key}
+        )
+
+        assert response.json()["status_code"] == 409
+        assert "Idempotent-Replayed" not in response.headers
+
+    def test_21_videocatalog_create_rejects_non_video(self, client):
+        """
+        Test case for uploading a file that is not a known video container.
+
+        An image is sent as the video; it must be rejected by the magic bytes check.
+
+        """
+        data = {"title": "test", "description": "This is a test video"}
+
+        response = client.post(
+            "/videocatalog/create/",
+            data=data,
+            files={"video": ("fake_video.mp4", io.BytesIO(fake.image()), "video/mp4")},
+        )
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "Video Content type is not supported"
+
+    def test_22_videocatalog_create_rejects_too_large(self, client, monkeypatch):
+        """
+        Test case for uploading a video larger than the configured limit.
+
+        """
+        monkeypatch.setattr(upload, "UPLOAD_MAX_BYTES", 512)
+
+        response = TestCaseHelper.create_catalog_object(client)
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "Video Content is too large"
+
+    def test_23_videocatalog_detail_batch(self, client):
+        """
+        Test case for retrieving several videos in one request.
+
+        The videos must come back in the requested order and unknown IDs must be
+        listed as not found.
+
+        """
+        first = TestCaseHelper.create_catalog_object(client).json()["data"]["id"]
+        second = TestCaseHelper.create_catalog_object(client).json()["data"]["id"]
+        missing = second + 1000
+
+        response = client.get(f"/videocatalog/detail/?ids={second},{missing},{first}")
+
+        assert response.json()["status_code"] == 200
+        assert [video["id"] for video in response.json()["data"]] == [second, first]
+        assert response.json()["not_found"] == [missing]
+
+        # Revalidating with the ETag returns 304 while nothing changed
+        etag = response.headers["ETag"]
+        cached = client.get(
+            f"/videocatalog/detail/?ids={second},{missing},{first}",
+            headers={"If-None-Match": etag},
+        )
+        assert cached.status_code == 304
+
+    def test_24_videocatalog_detail_batch_invalid_ids(self, client):
+        """
+        Test case for retrieving several videos with a malformed ID list.
+
+        """
+        response = client.get("/videocatalog/detail/?ids=1,abc")
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "Video IDs must be comma separated integers"
+
+        response = client.get("/videocatalog/detail/", params={"ids": "1,\u00b2"})
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "Video IDs must be comma separated integers"
+
+    def test_25_videocatalog_stream(self, client):
+        """
+        Test case for streaming the stored file of a video.
+
+        """
+        res = TestCaseHelper.create_catalog_object(client)
+        video_catalog_id = res.json()["data"]["id"]
+
+        response = client.get(f"/videocatalog/stream/{video_catalog_id}")
+
+        assert response.status_code == 200
+        assert response.content.startswith(b"\x00\x00\x00\x18ftyp")
+
+    def test_26_videocatalog_stream_failed(self, client):
+        """
+        Test case for streaming a video that does not exist in the video catalog.
+
+        """
+        response = client.get("/videocatalog/stream/66")
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "obj not found"
+
+    def test_27_videocatalog_changes(self, client):
+        """
+        Test case for reading the change feed after creating, editing and deleting a video.
+
+        The feed must list the three changes in order, with a tombstone (no video
+        data) for the delete.
+
+        """
+        cursor = client.get("/videocatalog/changes/?since=0&limit=1000").json()["next_cursor"]
+
+        res = TestCaseHelper.create_catalog_object(client)
+        video_catalog_id = res.json()["data"]["id"]
+        client.post(
+            f"/videocatalog/edit/{video_catalog_id}/",
+            data={"title": "Updated Title", "description": "Updated Description"},
+        )
+        client.post(f"/videocatalog/delete/{video_catalog_id}/")
+
+        response = client.get(f"/videocatalog/changes/?since={cursor}")
+
+        assert response.json()["status_code"] == 200
+        changes = response.json()["data"]
+        assert [change["operation"] for change in changes] == ["create", "update", "delete"]
+        assert all(change["video_id"] == video_catalog_id for change in changes)
+        assert changes[-1]["video"] is None
+        assert response.json()["next_cursor"] == changes[-1]["seq"]
+        assert response.json()["has_more"] is False
+
+    def test_28_videocatalog_stats(self, client):
+        """
+        Test case for the catalog stats following creates and deletes.
+
+        The list total must come from the same stats.
+
+        """
+        before = client.get("/videocatalog/stats/").json()["data"]
+
+        first = TestCaseHelper.create_catalog_object(client).json()["data"]
+        second = TestCaseHelper.create_catalog_object(client).json()["data"]
+        client.post(f"/videocatalog/delete/{first['id']}/")
+
+        response = client.get("/videocatalog/stats/")
+
+        assert response.json()["status_code"] == 200
+        stats = response.json()["data"]
+        assert stats["total_videos"] == before["total_videos"] + 1
+        assert stats["total_duration"] == before["total_duration"] + second["duration"]
+        assert stats["by_hls_status"] == before["by_hls_status"]
+
+        listing = client.get("/videocatalog/list/?page=1&limit=1").json()
+        assert listing["total_pages"] == stats["total_videos"]
+
+    def test_29_videocatalog_delete_and_restore(self, client):
+        """
+        Test case for deleting a video into the archive and restoring it.
+
+        The restored video keeps its id, reappears in the change feed as a
+        create and is counted in the stats again.
+
+        """
+        res = TestCaseHelper.create_catalog_object(client)
+        video_catalog_id = res.json()["data"]["id"]
+        stats = client.get("/videocatalog/stats/").json()["data"]
+        cursor = client.get("/videocatalog/changes/?since=0&limit=1000").json()["next_cursor"]
+
+        client.post(f"/videocatalog/delete/{video_catalog_id}/")
+        assert client.get(f"/videocatalog/detail/{video_catalog_id}").json()["status_code"] == 400
+
+        response = client.post(f"/videocatalog/restore/{video_catalog_id}/")
+
+        assert response.json()["status_code"] == 200
+        assert response.json()["data"]["id"] == video_catalog_id
+        assert client.get(f"/videocatalog/detail/{video_catalog_id}").json()["status_code"] == 200
+        assert client.get("/videocatalog/stats/").json()["data"] == stats
+        changes = client.get(f"/videocatalog/changes/?since={cursor}").json()["data"]
+        assert [change["operation"] for change in changes] == ["delete", "create"]
+        assert changes[-1]["video"]["id"] == video_catalog_id
+
+    def test_30_videocatalog_restore_failed(self, client):
+        """
+        Test case for restoring a video that is not in the archive.
+
+        """
+        response = client.post("/videocatalog/restore/66/")
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "obj not found"
+
+    def test_31_videocatalog_same_filename_uploads(self, client):
+        """
+        Test case for two uploads with the same client filename.
+
+        Each gets its own server-assigned file, so neither overwrites the other.
+
+        """
+        first = TestCaseHelper.create_catalog_object(client).json()["data"]
+        second = TestCaseHelper.create_catalog_object(client).json()["data"]
+
+        assert first["video_file"] != second["video_file"]
+        assert not first["video_file"].endswith("fake_video.mp4")
+        first_stream = client.get(f"/videocatalog/stream/{first['id']}").content
+        second_stream = client.get(f"/videocatalog/stream/{second['id']}").content
+        assert first_stream != second_stream
+
+    def test_32_videocatalog_edit_sets_updated_at(self, client):
+        """
+        Test case for an edit moving a video into an updated_after window.
+
+        """
+        res = TestCaseHelper.create_catalog_object(client)
+        video_catalog_id = res.json()["data"]["id"]
+        window = {"updated_after": datetime.now(timezone.utc).isoformat(), "limit": 100}
+
+        before = client.get("/videocatalog/list/", params=window).json()["data"]
+        client.post(
+            f"/videocatalog/edit/{video_catalog_id}/",
+            data={"title": "Updated Title", "description": "Updated Description"},
+        )
+        after = client.get("/videocatalog/list/", params=window).json()["data"]
+
+        assert video_catalog_id not in [video["id"] for video in before]
+        assert video_catalog_id in [video["id"] for video in after]
+        detail = client.get(f"/videocatalog/detail/{video_catalog_id}").json()["data"]
+        assert datetime.fromisoformat(detail["updated_at"]) > datetime.fromisoformat(
+            detail["created_at"]
+        )
+
+    def test_33_videocatalog_stream_outside_content_path(self, client, db_session):
+        """
+        Test case for streaming a legacy video whose file lies outside the content directory.
+
+        """
+        video = Video(title="legacy", video_file=os.path.abspath(__file__))
+        db_session.add(video)
+        db_session.commit()
+
+        response = client.get(f"/videocatalog/stream/{video.id}")
+
+        assert response.json()["status_code"] == 400
+        assert response.json()["message"] == "obj not found"
+
+    @pytest.mark.parametrize(
+        "content, status_code",
+        [
+            (b"GIF89a" + b"x" * 100, 400),
+            (b"Garbage in, garbage out\n" * 40, 400),
+            ((b"\x47" + bytes(187)) * 2 + b"x" * 300, 400),
+            ((b"\x47\x40\x00\x10" + bytes(184)) * 4, 200),
+        ],
+    )
+    def test_34_videocatalog_create_mpeg_ts_sniffing(self, client, content, status_code):
+        """
+        Test case for recognising MPEG transport streams by their packet sync bytes.
+
+        A file merely starting with "G" (0x47) must be rejected; the sync byte has
+        to be present at the start of the first three 188-byte packets.
+
+        """
+        response = client.post(
+            "/videocatalog/create/",
+            data={"title": "test", "description": "This is a test video"},
+            files={"video": ("fake_video.ts", io.BytesIO(content), "video/mp2t")},
+        )
+
+        assert response.json()["status_code"] == status_code
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+from src.api import idempotency
+from src.api.idempotency import IdempotencyPurger, IdempotencyService
+from src.api.model import IdempotencyKey
+
+
+class TestIdempotency:
+    def test_01_purge_expired_keys(self, db_session):
+        """
+        Test case for deleting expired idempotency keys in batches.
+
+        Keys that have not expired yet, completed or in progress, are kept.
+
+        """
+        now = datetime.now(timezone.utc)
+        expired, valid = now - timedelta(minutes=1), now + timedelta(hours=1)
+        db_session.add_all(
+            [
+                IdempotencyKey(key="purge-done", status="completed", expires_at=expired),
+                IdempotencyKey(key="purge-stuck", status="in_progress", expires_at=expired),
+                IdempotencyKey(key="purge-old", status="completed", expires_at=expired),
+                IdempotencyKey(key="purge-live", status="completed", expires_at=valid),
+                IdempotencyKey(key="purge-busy", status="in_progress", expires_at=valid),
+            ]
+        )
+        db_session.commit()
+
+        purger = IdempotencyPurger(interval=60, batch_size=2)
+
+        assert purger.purge(db_session) == 3
+        remaining = [
+            row.key
+            for row in db_session.query(IdempotencyKey)
+            .filter(IdempotencyKey.key.like("purge-%"))
+            .order_by(IdempotencyKey.key)
+        ]
+        assert remaining == ["purge-busy", "purge-live"]
+
+    def test_02_wait_polls_in_threadpool(self, db_session, monkeypatch):
+        """
+        Test case for a retry waiting on a key owned by another request.
+
+        Every claim and lookup runs outside the event loop thread, so waiting
+        retries never block other requests.
+
+        """
+        monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_TIMEOUT", 0.3)
+        monkeypatch.setattr(idempotency, "IDEMPOTENCY_POLL_INTERVAL", 0.05)
+        service = IdempotencyService(db_session)
+        assert service.claim("wait-owned")
+
+        threads = []
+        for name in ("claim", "lookup"):
+            method = getattr(service, name)
+
+            def record(key, method=method):
+                threads.append(threading.get_ident())
+                return method(key)
+
+            monkeypatch.setattr(service, name, record)
+
+        async def wait():
+            return threading.get_ident(), await service.begin("wait-owned")
+
+        loop_thread, (result, replayed) = asyncio.run(wait())
+
+        assert result["status_code"] == 409
+        assert not replayed
+        assert len(threads) >= 4
+        assert loop_thread not in threads
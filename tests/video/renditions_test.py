@@ -0,0 +1,180 @@
+import os
+import subprocess
+import threading
+import time
+
+from concurrent.futures import Future
+
+import imageio_ffmpeg
+import pytest
+
+from database import SessionLocal, engine
+from src.api.model import Video
+from src.api import renditions
+from src.api.storage import is_content_key
+from src.api.renditions import (
+    HLS_READY,
+    RenditionPipeline,
+    parse_ladder,
+    transcode_hls,
+)
+
+
+@pytest.fixture
+def connection(app):
+    """A connection whose writes are rolled back after the test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+def make_job(pipeline):
+    # A finished job whose output directory holds a master playlist
+    output_dir = pipeline.job_dir()
+    os.makedirs(output_dir)
+    master = os.path.join(output_dir, "master.m3u8")
+    with open(master, "w") as playlist:
+        playlist.write("#EXTM3U\n")
+    future = Future()
+    future.set_result(master)
+    return output_dir, future
+
+
+class TestRenditions:
+    def test_01_parse_ladder(self):
+        """
+        Test case for parsing the rendition ladder setting, lowest rung first.
+
+        """
+        assert parse_ladder(["720:2800:128", "360:800:96"]) == [
+            (360, 800, 96),
+            (720, 2800, 128),
+        ]
+
+    def test_02_transcode_hls(self, tmp_path):
+        """
+        Test case for transcoding a short clip into HLS renditions.
+
+        A 240p source must only produce the lowest rung, referenced from the
+        master playlist.
+
+        """
+        source = str(tmp_path / "source.mp4")
+        subprocess.run(
+            [
+                imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", "testsrc=duration=1:size=320x240:rate=24",
+                "-pix_fmt", "yuv420p", source,
+            ],
+            check=True,
+        )
+
+        ladder = [(240, 300, 64), (720, 2800, 128)]
+        master = transcode_hls(source, str(tmp_path / "hls" / "job"), ladder)
+
+        with open(master) as playlist:
+            content = playlist.read()
+        assert "RESOLUTION=320x240" in content
+        assert "240p.m3u8" in content
+        assert "720p.m3u8" not in content
+        assert os.path.exists(os.path.join(os.path.dirname(master), "240p.m3u8"))
+
+    def test_03_jobs_keep_separate_directories(self, connection, tmp_path):
+        """
+        Test case for a job finishing after its video got a newer upload.
+
+        Each job writes to its own directory. The stale job's output is dropped
+        without touching the row, and the current job replaces the renditions
+        stored before.
+
+        """
+        def session_factory():
+            return SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+
+        db = session_factory()
+        pipeline = RenditionPipeline(
+            1, str(tmp_path), [(240, 300, 64)], session_factory=session_factory
+        )
+        video = Video(title="renditions", video_file="new.mp4", hls_status="pending")
+        db.add(video)
+        db.commit()
+        previous_dir, _ = make_job(pipeline)
+        video.hls_playlist = os.path.join(previous_dir, "master.m3u8")
+        db.commit()
+
+        stale_dir, stale = make_job(pipeline)
+        current_dir, current = make_job(pipeline)
+        assert len({previous_dir, stale_dir, current_dir}) == 3
+        assert is_content_key(os.path.relpath(current_dir, str(tmp_path)))
+
+        pipeline._on_done(video.id, "old.mp4", stale_dir, stale)
+        db.refresh(video)
+        assert video.hls_status == "pending"
+        assert not os.path.exists(stale_dir)
+
+        pipeline._on_done(video.id, "new.mp4", current_dir, current)
+        db.refresh(video)
+        assert video.hls_status == HLS_READY
+        assert video.hls_playlist == current.result()
+        assert os.path.exists(current_dir)
+        assert not os.path.exists(previous_dir)
+
+    def test_04_resume_pending_after_restart(self, connection, tmp_path, monkeypatch):
+        """
+        Test case for resubmitting the videos left pending by a previous process.
+
+        """
+        def session_factory():
+            return SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+
+        db = session_factory()
+        pending = Video(title="resume", video_file="pending.mp4", hls_status="pending")
+        ready = Video(title="resume", video_file="ready.mp4", hls_status=HLS_READY)
+        db.add_all([pending, ready])
+        db.commit()
+
+        pipeline = RenditionPipeline(
+            1, str(tmp_path), [(240, 300, 64)], session_factory=session_factory
+        )
+        submitted = []
+        monkeypatch.setattr(pipeline, "submit", lambda *job: submitted.append(job))
+
+        assert pipeline.resume_pending() == len(submitted)
+        assert (pending.id, "pending.mp4") in submitted
+        assert (ready.id, "ready.mp4") not in submitted
+
+    def test_05_concurrent_submits_share_one_pool(self, tmp_path, monkeypatch):
+        """
+        Test case for the first jobs being submitted from several threads at once.
+
+        Only one process pool is created, and its workers are spawned rather
+        than forked from the threaded server process.
+
+        """
+        pools = []
+
+        class SlowPool:
+            def __init__(self, max_workers, mp_context):
+                time.sleep(0.05)  # Widen the window between the check and the assignment
+                self.start_method = mp_context.get_start_method()
+                pools.append(self)
+
+            def submit(self, *args):
+                return Future()
+
+        monkeypatch.setattr(renditions, "ProcessPoolExecutor", SlowPool)
+        pipeline = RenditionPipeline(1, str(tmp_path), [(240, 300, 64)])
+
+        threads = [
+            threading.Thread(target=pipeline.submit, args=(video_id, "clip.mp4"))
+            for video_id in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(pools) == 1
+        assert pools[0].start_method == "spawn"
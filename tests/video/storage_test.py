@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.api import storage as storage_module
+from src.api.storage import LocalStorage, TieredStorage, content_key, is_content_key
+
+
+class TestStorage:
+    def test_01_local_storage_roundtrip(self, tmp_path):
+        """
+        Test case for put, get, stat, stream and delete on the local storage.
+
+        """
+        storage = LocalStorage(str(tmp_path))
+
+        path = storage.put("clips/a.mp4", b"video-bytes")
+
+        assert path == os.path.join(str(tmp_path), "clips", "a.mp4")
+        assert storage.get("clips/a.mp4") == b"video-bytes"
+        assert storage.stat("clips/a.mp4")["size"] == 11
+        assert b"".join(storage.stream("clips/a.mp4", chunk_size=4)) == b"video-bytes"
+        assert storage.delete("clips/a.mp4")
+        assert storage.stat("clips/a.mp4") is None
+
+    def test_02_tiered_storage_migrates_and_promotes(self, tmp_path):
+        """
+        Test case for moving an idle file to the cold tier and back on access.
+
+        """
+        storage = TieredStorage(
+            str(tmp_path / "hot"), str(tmp_path / "cold"), cold_after=60, interval=60
+        )
+        storage.put("a.mp4", b"cold-bytes")
+        storage.put("b.mp4", b"hot-bytes")
+
+        # Pretend a.mp4 was last accessed two minutes ago
+        past = time.time() - 120
+        os.utime(storage.hot.path("a.mp4"), (past, past))
+
+        assert storage.migrate_cold() == 1
+        assert storage.stat("a.mp4")["tier"] == "cold"
+        assert storage.stat("b.mp4")["tier"] == "hot"
+
+        assert storage.get("a.mp4") == b"cold-bytes"
+        assert storage.stat("a.mp4")["tier"] == "hot"
+        assert storage.cold.stat("a.mp4") is None
+
+    def test_03_tiered_storage_skips_excluded_directories(self, tmp_path):
+        """
+        Test case for leaving excluded directories (such as HLS renditions) in the hot tier.
+
+        """
+        storage = TieredStorage(
+            str(tmp_path / "hot"), str(tmp_path / "cold"), 60, 60, exclude=["hls"]
+        )
+        storage.put("hls/1/master.m3u8", b"#EXTM3U")
+        past = time.time() - 120
+        os.utime(storage.hot.path("hls/1/master.m3u8"), (past, past))
+
+        assert storage.migrate_cold() == 0
+
+    def test_04_content_keys_are_sharded_and_unique(self):
+        """
+        Test case for server-assigned content keys.
+
+        Keys fan out over two directory levels, never collide for the same
+        client filename and keep nothing of the filename but a plain extension.
+
+        """
+        first, second = content_key("clip.MP4"), content_key("clip.MP4")
+
+        assert first != second
+        assert is_content_key(first) and is_content_key(second)
+        assert first.endswith(".mp4")
+        assert first.split("/")[2].startswith(first[:2] + first[3:5])
+        assert is_content_key(content_key("../../etc/passwd"))
+        assert ".." not in content_key("../../etc/passwd")
+        assert not is_content_key("clip.mp4")
+
+    def test_05_tiered_storage_copies_within_tier(self, tmp_path):
+        """
+        Test case for copying a cold file to a new key without promoting it.
+
+        """
+        storage = TieredStorage(
+            str(tmp_path / "hot"), str(tmp_path / "cold"), cold_after=60, interval=60
+        )
+        storage.cold.put("old.mp4", b"cold-bytes")
+
+        path = storage.copy("old.mp4", "ab/cd/new.mp4")
+
+        assert path == storage.hot.path("ab/cd/new.mp4")
+        assert storage.stat("ab/cd/new.mp4")["tier"] == "cold"
+        assert storage.get("ab/cd/new.mp4") == b"cold-bytes"
+
+    def test_06_tiered_storage_locks_per_key(self, tmp_path):
+        """
+        Test case for other keys staying usable while one key is being moved.
+
+        """
+        storage = TieredStorage(
+            str(tmp_path / "hot"), str(tmp_path / "cold"), cold_after=60, interval=60
+        )
+        storage.put("a.mp4", b"big-bytes")
+
+        # Hold a.mp4 as a long cold/hot move would
+        with storage._locked("a.mp4"):
+            other = threading.Thread(target=storage.put, args=("b.mp4", b"other-bytes"))
+            other.start()
+            other.join(2)
+            same = threading.Thread(target=storage.local_path, args=("a.mp4",))
+            same.start()
+            same.join(0.2)
+
+            assert not other.is_alive()
+            assert same.is_alive()
+        same.join(2)
+
+        assert storage.get("b.mp4") == b"other-bytes"
+        assert storage._key_locks == {}
+
+    def test_07_tiered_stream_promotes_lazily(self, tmp_path):
+        """
+        Test case for streaming a cold file.
+
+        The file is only moved to the hot tier once the stream is iterated, so
+        the request handler never copies it on the event loop.
+
+        """
+        storage = TieredStorage(
+            str(tmp_path / "hot"), str(tmp_path / "cold"), cold_after=60, interval=60
+        )
+        storage.cold.put("a.mp4", b"cold-bytes")
+
+        chunks = storage.stream("a.mp4", chunk_size=4)
+
+        assert storage.stat("a.mp4")["tier"] == "cold"
+        assert b"".join(chunks) == b"cold-bytes"
+        assert storage.stat("a.mp4")["tier"] == "hot"
+
+    def test_08_tiered_storage_requires_cold_path(self, monkeypatch):
+        """
+        Test case for refusing to start the tiered backend without a cold tier.
+
+        """
+        monkeypatch.setattr(storage_module, "STORAGE_BACKEND", "tiered")
+        monkeypatch.setattr(storage_module, "COLD_CONTENT_PATH", None)
+
+        with pytest.raises(ValueError, match="COLD_CONTENT_PATH"):
+            storage_module.get_storage()